@@ -0,0 +1,226 @@
+"""Synthetic corpora for benchmarks.
+
+Rows are written with batched ``bulk_create``, so signals do not run; the
+counters and the follow timelines are rebuilt at the end the way the
+signals would have left them. Authorship and follows are skewed with a
+Zipf distribution: a few authors write and are followed most.
+"""
+import random
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import accumulate
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.utils import timezone
+from faker import Faker
+
+from posts.models import (
+    Comment, Follow, Group, Post, TimelineEntry, User, UserStats
+)
+from posts.stats import recount
+from posts.timeline import chunked
+
+Scale = namedtuple('Scale', 'users groups posts comments follows')
+
+SCALES = {
+    '10k': Scale(
+        users=200, groups=10, posts=5000, comments=4000, follows=800
+    ),
+    '1m': Scale(
+        users=20_000, groups=100, posts=500_000, comments=400_000,
+        follows=80_000,
+    ),
+    '10m': Scale(
+        users=200_000, groups=500, posts=5_000_000, comments=4_000_000,
+        follows=800_000,
+    ),
+}
+USERNAME_PREFIX = 'bench'
+PASSWORD = 'benchmark'
+ZIPF_EXPONENT = 1.1
+DAYS = 365
+TEXTS = 1000
+
+
+def zipf_weights(count):
+    return list(accumulate(
+        1 / rank ** ZIPF_EXPONENT for rank in range(1, count + 1)
+    ))
+
+
+@contextmanager
+def explicit_dates(*fields):
+    """Let ``bulk_create`` keep the given ``auto_now_add`` values."""
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Generator:
+    def __init__(self, scale, batch_size=5000, seed=1, log=None):
+        self.scale = scale
+        self.batch_size = batch_size
+        self.random = random.Random(seed)
+        self.faker = Faker('ru_RU')
+        self.faker.seed_instance(seed)
+        self.log = log or (lambda message: None)
+        self.now = timezone.now()
+        self.start = self.now - timedelta(days=DAYS)
+
+    def moment(self, share):
+        return self.start + (self.now - self.start) * share
+
+    def save(self, model, rows, **kwargs):
+        for batch in chunked(rows, self.batch_size):
+            model.objects.bulk_create(
+                batch, batch_size=self.batch_size, **kwargs
+            )
+
+    def generate(self):
+        self.user_ids = self.create_users()
+        self.group_ids = self.create_groups()
+        self.create_posts()
+        self.create_comments()
+        self.create_follows()
+        self.log('Пересчёт счётчиков')
+        for user_ids in chunked(self.user_ids, self.batch_size):
+            recount(user_ids)
+        self.log('Заполнение лент подписок')
+        self.fill_timelines()
+        cache.clear()
+
+    def create_users(self):
+        self.log(f'Пользователи: {self.scale.users}')
+        password = make_password(PASSWORD)
+        first_names = [self.faker.first_name() for _ in range(TEXTS)]
+        last_names = [self.faker.last_name() for _ in range(TEXTS)]
+        self.save(User, (
+            User(
+                username=f'{USERNAME_PREFIX}{number}',
+                first_name=self.random.choice(first_names),
+                last_name=self.random.choice(last_names),
+                password=password,
+            ) for number in range(self.scale.users)
+        ))
+        user_ids = list(User.objects.filter(
+            username__startswith=USERNAME_PREFIX
+        ).order_by('pk').values_list('pk', flat=True))
+        self.random.shuffle(user_ids)
+        return user_ids
+
+    def create_groups(self):
+        self.log(f'Группы: {self.scale.groups}')
+        self.save(Group, (
+            Group(
+                title=self.faker.sentence(nb_words=3)[:200],
+                slug=f'{USERNAME_PREFIX}-{number}',
+                description=self.faker.paragraph(),
+            ) for number in range(self.scale.groups)
+        ))
+        return list(Group.objects.filter(
+            slug__startswith=f'{USERNAME_PREFIX}-'
+        ).values_list('pk', flat=True))
+
+    def create_posts(self):
+        self.log(f'Посты: {self.scale.posts}')
+        texts = [self.faker.paragraph(nb_sentences=5) for _ in range(TEXTS)]
+        weights = zipf_weights(len(self.user_ids))
+        posts = self.scale.posts
+
+        def rows():
+            for start in range(0, posts, self.batch_size):
+                count = min(self.batch_size, posts - start)
+                authors = self.random.choices(
+                    self.user_ids, cum_weights=weights, k=count
+                )
+                for number, author_id in enumerate(authors, start=start):
+                    yield Post(
+                        text=self.random.choice(texts),
+                        author_id=author_id,
+                        group_id=(
+                            self.random.choice(self.group_ids)
+                            if self.random.random() < 0.7 else None
+                        ),
+                        pub_date=self.moment(number / posts),
+                    )
+
+        with explicit_dates(Post._meta.get_field('pub_date')):
+            self.save(Post, rows())
+
+    def post_picker(self):
+        """Return a sampler of post ids favouring recent posts."""
+        posts = Post.objects.order_by('pk').values_list('pk', flat=True)
+        first, last = posts.first(), posts.last()
+        if last - first + 1 == posts.count():
+            post_ids = range(first, last + 1)
+        else:
+            post_ids = list(posts)
+
+        def pick():
+            share = 1 - self.random.random() ** 3
+            return post_ids[min(int(len(post_ids) * share), len(post_ids) - 1)]
+
+        return pick
+
+    def create_comments(self):
+        self.log(f'Комментарии: {self.scale.comments}')
+        texts = [self.faker.sentence() for _ in range(TEXTS)]
+        pick_post = self.post_picker()
+        with explicit_dates(Comment._meta.get_field('created')):
+            self.save(Comment, (
+                Comment(
+                    post_id=pick_post(),
+                    author_id=self.random.choice(self.user_ids),
+                    text=self.random.choice(texts),
+                    created=self.moment(self.random.random()),
+                ) for _ in range(self.scale.comments)
+            ))
+
+    def create_follows(self):
+        """Out-degrees follow a Pareto law, authors are picked by Zipf."""
+        self.log(f'Подписки: около {self.scale.follows}')
+        weights = zipf_weights(len(self.user_ids))
+        mean = self.scale.follows / len(self.user_ids)
+        limit = len(self.user_ids) - 1
+
+        def rows():
+            for user_id in self.user_ids:
+                degree = min(
+                    int(self.random.paretovariate(1.5) * mean / 3), limit
+                )
+                authors = set(self.random.choices(
+                    self.user_ids, cum_weights=weights, k=degree
+                ))
+                authors.discard(user_id)
+                for author_id in authors:
+                    yield Follow(user_id=user_id, author_id=author_id)
+
+        self.save(Follow, rows(), ignore_conflicts=True)
+
+    def fill_timelines(self):
+        authors = list(UserStats.objects.filter(
+            user__username__startswith=USERNAME_PREFIX,
+            followers_count__gt=0,
+            followers_count__lte=settings.TIMELINE_FANOUT_LIMIT,
+        ).values_list('user_id', flat=True))
+        for author_id in authors:
+            posts = list(Post.objects.filter(author_id=author_id).order_by(
+                '-pub_date', '-pk'
+            ).values_list('pk', 'pub_date')[:settings.TIMELINE_BACKFILL])
+            followers = list(Follow.objects.filter(
+                author_id=author_id
+            ).values_list('user_id', flat=True))
+            self.save(TimelineEntry, (
+                TimelineEntry(
+                    user_id=user_id, post_id=post_id,
+                    author_id=author_id, pub_date=pub_date,
+                )
+                for user_id in followers for post_id, pub_date in posts
+            ), ignore_conflicts=True)
@@ -0,0 +1,184 @@
+import json
+import random
+import statistics
+import time
+from collections import Counter
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+
+from posts import urls
+from posts.models import Comment, Follow, Group, Post, User
+
+# Views that write on GET are left out so runs do not change the data.
+SKIPPED = {'profile_follow', 'profile_unfollow'}
+EXTRA_VIEWS = (
+    ('login', ()), ('signup', ()), ('about:author', ()), ('about:tech', ()),
+)
+GUEST_VIEWS = {'login', 'signup'}
+QUERY_VIEWS = {'search': {'q': 'лев'}}
+SAMPLE = 1000
+
+
+def percentile(values, share):
+    """Linearly interpolated percentile; ``statistics.quantiles`` needs 3.8."""
+    values = sorted(values)
+    position = (len(values) - 1) * share / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет p50/p95/p99 времени ответа и число запросов к базе для '
+        'каждой страницы на текущих данных и пишет результат в JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=50,
+            help='Сколько запросов делать к каждой странице',
+        )
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Очищать кеш перед каждым запросом',
+        )
+        parser.add_argument(
+            '--output', help='Файл, в который записать результат в JSON',
+        )
+        parser.add_argument(
+            '--compare', help='JSON прошлого прогона для сравнения p95',
+        )
+        parser.add_argument(
+            '--label', default='', help='Подпись прогона',
+        )
+        parser.add_argument('--seed', type=int, default=1)
+
+    def views(self):
+        for pattern in urls.urlpatterns:
+            if (
+                isinstance(pattern, URLPattern)
+                and pattern.name and pattern.name not in SKIPPED
+            ):
+                yield pattern.name, tuple(pattern.pattern.converters)
+        yield from EXTRA_VIEWS
+
+    def samples(self):
+        posts = list(Post.objects.order_by('-pk').values_list(
+            'author__username', 'pk'
+        )[:SAMPLE])
+        slugs = list(Group.objects.values_list('slug', flat=True)[:SAMPLE])
+        if not posts or not slugs:
+            raise CommandError(
+                'Нужны посты и группы: запустите generate_corpus'
+            )
+        return posts, slugs
+
+    def arguments(self, converters, posts, slugs):
+        username, post_id = self.random.choice(posts)
+        values = {
+            'username': username,
+            'post_id': post_id,
+            'slug': self.random.choice(slugs),
+        }
+        return {name: values[name] for name in converters}
+
+    def measure(self, client, name, converters, posts, slugs, options):
+        """Time a view's pages; redirects are counted but not timed."""
+        latencies, queries, statuses = [], [], Counter()
+        data = QUERY_VIEWS.get(name, {})
+        client.get(reverse(name, kwargs=self.arguments(
+            converters, posts, slugs
+        )), data)
+        for _ in range(options['requests']):
+            url = reverse(name, kwargs=self.arguments(
+                converters, posts, slugs
+            ))
+            if options['cold']:
+                cache.clear()
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get(url, data)
+                elapsed = (time.perf_counter() - started) * 1000
+            statuses[str(response.status_code)] += 1
+            if 300 <= response.status_code < 400:
+                continue
+            latencies.append(elapsed)
+            queries.append(len(captured.captured_queries))
+        if len(latencies) < 2:
+            return None
+        return {
+            'requests': len(latencies),
+            'statuses': dict(statuses),
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'queries_mean': round(statistics.mean(queries), 2),
+            'queries_max': max(queries),
+        }
+
+    def handle(self, *args, **options):
+        if options['requests'] < 2:
+            raise CommandError('Нужно хотя бы два запроса на страницу')
+        self.random = random.Random(options['seed'])
+        posts, slugs = self.samples()
+        reader = User.objects.order_by('-stats__following_count').first()
+        reader_client, guest_client = Client(), Client()
+        reader_client.force_login(reader)
+        result = {
+            'label': options['label'],
+            'created': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'cold': options['cold'],
+            'rows': {
+                model.__name__: model.objects.count()
+                for model in (User, Group, Post, Comment, Follow)
+            },
+            'views': {},
+            'skipped': [],
+        }
+        with override_settings(DEBUG=False, ALLOWED_HOSTS=['testserver']):
+            for name, converters in self.views():
+                client = (
+                    guest_client if name in GUEST_VIEWS else reader_client
+                )
+                stats = self.measure(
+                    client, name, converters, posts, slugs, options
+                )
+                if stats is None:
+                    result['skipped'].append(name)
+                    self.stdout.write(
+                        f'{name}: пропущено, страница перенаправляет'
+                    )
+                    continue
+                result['views'][name] = stats
+                self.stdout.write(
+                    f'{name}: p50 {stats["p50_ms"]} мс, '
+                    f'p95 {stats["p95_ms"]} мс, p99 {stats["p99_ms"]} мс, '
+                    f'запросов {stats["queries_mean"]}, '
+                    f'ответы {stats["statuses"]}'
+                )
+        if options['compare']:
+            self.compare(result, options['compare'])
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(result, output, ensure_ascii=False, indent=2)
+                output.write('\n')
+
+    def compare(self, result, path):
+        with open(path) as previous_file:
+            previous = json.load(previous_file)['views']
+        for name, stats in result['views'].items():
+            if name not in previous:
+                continue
+            before, after = previous[name]['p95_ms'], stats['p95_ms']
+            change = (after - before) / before * 100 if before else 0
+            self.stdout.write(
+                f'{name}: p95 {before} → {after} мс ({change:+.0f}%)'
+            )
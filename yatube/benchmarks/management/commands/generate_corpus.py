@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.corpus import SCALES, USERNAME_PREFIX, Generator
+from posts.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими пользователями, группами, постами, '
+        'комментариями и подписками для бенчмарков'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale', choices=SCALES, default='10k',
+            help='Примерное общее число строк',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Сколько строк вставлять одним запросом',
+        )
+        parser.add_argument(
+            '--seed', type=int, default=1,
+            help='Зерно генератора случайных чисел',
+        )
+
+    def handle(self, *args, **options):
+        if User.objects.filter(
+            username__startswith=USERNAME_PREFIX
+        ).exists():
+            raise CommandError('В базе уже есть сгенерированные данные')
+        started = time.monotonic()
+        Generator(
+            SCALES[options['scale']],
+            batch_size=options['batch_size'],
+            seed=options['seed'],
+            log=self.stdout.write,
+        ).generate()
+        self.stdout.write(
+            f'Готово за {time.monotonic() - started:.0f} с'
+        )
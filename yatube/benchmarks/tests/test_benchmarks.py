@@ -0,0 +1,63 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts.models import Comment, Follow, Post, TimelineEntry, UserStats
+
+from ..corpus import Generator, Scale
+
+SCALE = Scale(users=30, groups=3, posts=300, comments=200, follows=90)
+
+
+class BenchmarksTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        Generator(SCALE, batch_size=100).generate()
+
+    def test_corpus_has_the_requested_rows(self):
+        self.assertEqual(Post.objects.count(), SCALE.posts)
+        self.assertEqual(Comment.objects.count(), SCALE.comments)
+        self.assertTrue(Follow.objects.exists())
+        self.assertTrue(TimelineEntry.objects.exists())
+
+    def test_authorship_is_skewed(self):
+        counts = sorted(
+            UserStats.objects.values_list('posts_count', flat=True),
+            reverse=True
+        )
+        self.assertEqual(sum(counts), SCALE.posts)
+        self.assertGreater(counts[0], 5 * counts[len(counts) // 2])
+
+    def test_pub_dates_are_spread(self):
+        dates = Post.objects.values_list('pub_date', flat=True)
+        self.assertGreater(len(set(dates)), SCALE.posts // 2)
+
+    def test_benchmark_views_writes_json(self):
+        output = os.path.join(tempfile.mkdtemp(), 'run.json')
+        call_command(
+            'benchmark_views', requests=3, output=output, stdout=StringIO()
+        )
+        with open(output) as run:
+            result = json.load(run)
+        self.assertEqual(result['rows']['Post'], SCALE.posts)
+        for name in ('index', 'group_posts', 'profile', 'post', 'login'):
+            with self.subTest(view=name):
+                stats = result['views'][name]
+                self.assertLessEqual(stats['p50_ms'], stats['p99_ms'])
+                self.assertIn('queries_mean', stats)
+
+    def test_benchmark_views_skips_redirects(self):
+        output = os.path.join(tempfile.mkdtemp(), 'run.json')
+        call_command(
+            'benchmark_views', requests=2, output=output, stdout=StringIO()
+        )
+        with open(output) as run:
+            result = json.load(run)
+        self.assertIn('post_edit', result['skipped'])
+        self.assertNotIn('post_edit', result['views'])
+        self.assertEqual(result['views']['search']['statuses'], {'200': 2})
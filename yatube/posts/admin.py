@@ -1,13 +1,26 @@
 from django.contrib import admin
+from django.db.models import Q
 
-from .models import Comment, Follow, Group, Post
+from .models import Comment, Follow, Group, Post, User
+from .paginator import EstimatedCountPaginator
+from .search import matching_ids, search_available
 
 
 class PostAdmin(admin.ModelAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author')
+    list_select_related = ('author',)
     search_fields = ('text',)
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term or not search_available():
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        return queryset.filter(pk__in=matching_ids(search_term)), False
 
 
 class GroupAdmin(admin.ModelAdmin):
@@ -19,15 +32,43 @@ class GroupAdmin(admin.ModelAdmin):
 
 class CommentAdmin(admin.ModelAdmin):
     list_display = ('post', 'author', 'text', 'created')
-    search_fields = ('post', 'author')
+    list_select_related = ('post', 'author')
+    # Only turns the search box on, get_search_results matches the username
+    # of the author or the id of the post exactly.
+    search_fields = ('author__username', 'post__id')
     list_filter = ('created',)
     empty_value_display = '-пусто-'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        lookup = Q(author__in=User.objects.filter(
+            username=search_term
+        ).values('pk'))
+        if search_term.isdigit():
+            lookup |= Q(post_id=int(search_term))
+        return queryset.filter(lookup), False
 
 
 class FollowAdmin(admin.ModelAdmin):
     list_display = ('user', 'author')
-    search_fields = ('user', 'author')
+    list_select_related = ('user', 'author')
+    # Only turns the search box on, get_search_results matches the username
+    # of either side exactly.
+    search_fields = ('user__username', 'author__username')
     empty_value_display = '-пусто-'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        users = User.objects.filter(username=search_term).values('pk')
+        return queryset.filter(Q(user__in=users) | Q(author__in=users)), False
 
 
 admin.site.register(Post, PostAdmin)
@@ -0,0 +1,51 @@
+"""ORM access from async views.
+
+Django 3.2 runs the ORM synchronously only. Under ASGI the calls go to a
+pool of ``ASYNC_ORM_THREADS`` threads, so a burst of async requests queues
+for a bounded number of database connections instead of opening one per
+request. Under WSGI and the test client an async view is driven from the
+request thread, and the calls run there, inside that thread's transaction.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections
+
+_executor = None
+_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.ASYNC_ORM_THREADS,
+                thread_name_prefix='orm',
+            )
+    return _executor
+
+
+def in_pool(func, *args, **kwargs):
+    """Run ``func`` with the pool thread's connections checked like a
+    request: broken or expired ones are closed before and after.
+    """
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_sync(request, func, *args, **kwargs):
+    """Await the blocking ``func(*args, **kwargs)`` from an async view."""
+    if isinstance(request, ASGIRequest):
+        return await sync_to_async(
+            partial(in_pool, func), thread_sensitive=False,
+            executor=get_executor(),
+        )(*args, **kwargs)
+    return await sync_to_async(func)(*args, **kwargs)
@@ -0,0 +1,90 @@
+"""Conditional GET for pages built from write-invalidated feeds.
+
+The ETag comes from the same generations as the fragment caches. A
+generation is replaced on every post, comment and follow write it covers,
+so the ETag changes whenever the page could have. No ``Last-Modified`` is
+sent: it has whole-second precision, and a client sending only
+``If-Modified-Since`` would get a 304 for a write later in the same
+second. Computing the ETag costs one cache read and at most one small
+query resolving the URL into scopes, and a matching request gets its 304
+before the view runs.
+
+ETags are only sent while the generations live in a cache shared by
+all the processes. A per-process generation can predate a write handled by
+another process, and a 304 built from it would confirm a stale page.
+"""
+import hashlib
+
+from django.views.decorators.http import condition
+from django.views.decorators.vary import vary_on_cookie
+
+from . import generations
+from .models import Group, Post, User
+
+
+def conditional_page(get_scopes):
+    """Answer conditional GETs of a view from its generations.
+
+    ``get_scopes`` takes the view arguments and returns the scopes the page
+    depends on, or ``None`` to let the view handle a missing object. The
+    viewer's follow scope is added for signed-in users, and the ETag also
+    covers the viewer, the full URL and the CSRF cookie rendered into forms.
+    """
+    def get_version(request, *args, **kwargs):
+        if not generations.is_shared():
+            return None
+        if not hasattr(request, 'page_version'):
+            scopes = get_scopes(request, *args, **kwargs)
+            if scopes is not None and request.user.is_authenticated:
+                scopes.append(generations.follow_scope(request.user.pk))
+            request.page_version = (
+                None if scopes is None else generations.get_version(*scopes)
+            )
+        return request.page_version
+
+    def etag(request, *args, **kwargs):
+        version = get_version(request, *args, **kwargs)
+        if version is None:
+            return None
+        key = '|'.join((
+            version,
+            str(request.user.pk),
+            request.get_full_path(),
+            request.META.get('CSRF_COOKIE', ''),
+        ))
+        return hashlib.md5(key.encode()).hexdigest()
+
+    def decorator(view):
+        return vary_on_cookie(condition(etag_func=etag)(view))
+    return decorator
+
+
+def index_scopes(request):
+    return [generations.index_scope()]
+
+
+def group_scopes(request, slug):
+    group_id = Group.objects.filter(slug=slug).values_list(
+        'pk', flat=True
+    ).first()
+    if group_id is None:
+        return None
+    return [generations.group_scope(group_id)]
+
+
+def profile_scopes(request, username):
+    author_id = User.objects.filter(username=username).values_list(
+        'pk', flat=True
+    ).first()
+    if author_id is None:
+        return None
+    return [generations.profile_scope(author_id)]
+
+
+def post_scopes(request, username, post_id):
+    author_id = Post.objects.filter(
+        pk=post_id, author__username=username
+    ).values_list('author', flat=True).first()
+    if author_id is None:
+        return None
+    return [generations.profile_scope(author_id)]
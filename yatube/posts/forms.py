@@ -1,6 +1,7 @@
 from django import forms
 from django.forms import Textarea
 
+from . import uploads
 from .models import Comment, Post
 
 
@@ -14,6 +15,22 @@ class PostForm(forms.ModelForm):
             }
         }
 
+    def clean(self):
+        """Check an uploaded image before it is accepted.
+
+        The upload is checked even when ``ImageField`` already rejected it,
+        so a truncated oversized file reports its size, not a broken image.
+        """
+        cleaned_data = super().clean()
+        upload = self.files.get('image')
+        if upload is not None:
+            error = uploads.check(upload)
+            if error is not None:
+                self.errors.pop('image', None)
+                cleaned_data.pop('image', None)
+                self.add_error('image', error)
+        return cleaned_data
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
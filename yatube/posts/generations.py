@@ -0,0 +1,113 @@
+"""Write-invalidated versions of the cached feed fragments.
+
+Every feed has a generation stored in the cache. Feed fragments put the
+generation into their cache key, so a write only has to replace the
+generations it affects and the stale fragments are never read again.
+
+Generations are kept in the ``GENERATIONS_CACHE`` alias, which has to be
+shared by all the processes serving the site. A per-process local memory
+cache never sees the writes handled by the other processes, so there the
+generations expire after ``GENERATION_LOCAL_TIMEOUT`` seconds, which bounds
+how long such a process serves stale fragments.
+
+A replica may not have the write behind a generation yet. Fragments filled
+from it would be cached stale for the whole ``FEED_CACHE_TIMEOUT``, so a
+request reading a generation younger than ``REPLICA_STICKY_SECONDS`` reads
+the rest of its data from the primary.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+from yatube import routers
+
+KEY_PREFIX = 'posts:generation:'
+
+
+def index_scope():
+    return 'index'
+
+
+def group_scope(group_id):
+    return f'group:{group_id}'
+
+
+def profile_scope(author_id):
+    return f'profile:{author_id}'
+
+
+def follow_scope(user_id):
+    return f'follow:{user_id}'
+
+
+def new_generation():
+    return time.time_ns()
+
+
+def get_store():
+    return caches[settings.GENERATIONS_CACHE]
+
+
+def is_shared():
+    store = get_store()
+    return not isinstance(getattr(store, 'backend', store), LocMemCache)
+
+
+def get_timeout():
+    return None if is_shared() else settings.GENERATION_LOCAL_TIMEOUT
+
+
+def get_version(*scopes):
+    keys = [KEY_PREFIX + scope for scope in scopes]
+    generations = get_store().get_many(keys)
+    missing = {
+        key: new_generation() for key in keys if key not in generations
+    }
+    if missing:
+        get_store().set_many(missing, timeout=get_timeout())
+        generations.update(missing)
+    newest = max(generations.values())
+    if new_generation() - newest < settings.REPLICA_STICKY_SECONDS * 10 ** 9:
+        routers.use_primary()
+    return '.'.join(str(generations[key]) for key in keys)
+
+
+def bump(*scopes):
+    get_store().set_many(
+        {KEY_PREFIX + scope: new_generation() for scope in scopes},
+        timeout=get_timeout(),
+    )
+
+
+def follow_version(user, celebrity_ids):
+    """Version of the follow feed of ``user``.
+
+    Fan-out bumps the follow scope of every follower it writes to, so only
+    the authors above ``TIMELINE_FANOUT_LIMIT``, whose posts are merged in
+    at read time, add their profile scopes. Edits and comments change the
+    cards, which the fragment key covers on its own.
+    """
+    return get_version(
+        follow_scope(user.pk),
+        *(profile_scope(author_id) for author_id in sorted(celebrity_ids))
+    )
+
+
+def bump_post(post, *previous_group_ids):
+    group_ids = {post.group_id, *previous_group_ids} - {None}
+    bump(
+        index_scope(),
+        profile_scope(post.author_id),
+        *(group_scope(group_id) for group_id in group_ids)
+    )
+
+
+def bump_posts(posts):
+    """Bump the scopes of all ``posts`` with a single cache write."""
+    bump(
+        index_scope(),
+        *{profile_scope(post.author_id) for post in posts},
+        *{group_scope(post.group_id) for post in posts if post.group_id},
+    )
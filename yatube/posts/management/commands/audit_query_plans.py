@@ -0,0 +1,232 @@
+import json
+import os
+import re
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+
+from posts import urls
+from posts.models import Comment, Follow, Group, Post, User
+
+BASELINE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+    'query_plans.json'
+)
+FULL_SCAN = re.compile(r'^SCAN (\w+)(.*)$')
+TEMP_SORT = 'USE TEMP B-TREE FOR ORDER BY'
+QUERY = 'lion'
+
+
+class Rollback(Exception):
+    pass
+
+
+def outermost(sql, pattern):
+    """Matches of ``pattern`` in ``sql`` outside parenthesised subqueries."""
+    depth = 0
+    for match in re.finditer(rf'[()]|{pattern}', sql):
+        if match.group() == '(':
+            depth += 1
+        elif match.group() == ')':
+            depth -= 1
+        elif depth == 0:
+            yield match
+
+
+def main_table(sql):
+    match = next(outermost(sql, r'\bFROM "(\w+)"'), None)
+    return match and match.group(1)
+
+
+class Command(BaseCommand):
+    help = (
+        'Открывает каждый адрес posts/urls.py на тестовых данных, выполняет '
+        'EXPLAIN QUERY PLAN для всех запросов и сообщает о полных '
+        'просмотрах таблиц и сортировках во временном B-дереве, предлагая '
+        'составные индексы. Данные создаются в транзакции и откатываются'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ci', action='store_true',
+            help='Завершиться с ошибкой, если найдено что-то не из базовой '
+                 'линии',
+        )
+        parser.add_argument(
+            '--update-baseline', action='store_true',
+            help='Записать найденное как базовую линию',
+        )
+        parser.add_argument(
+            '--baseline', default=BASELINE,
+            help='Файл базовой линии',
+        )
+
+    def seed(self):
+        authors = [
+            User.objects.create_user(username=f'audit-author-{number}')
+            for number in range(5)
+        ]
+        groups = [
+            Group.objects.create(
+                title=f'Audit group {number}', slug=f'audit-group-{number}',
+                description='Audit group'
+            )
+            for number in range(3)
+        ]
+        posts = [
+            Post.objects.create(
+                text=f'Post number {number} about a {QUERY}',
+                author=authors[number % len(authors)],
+                group=groups[number % len(groups)] if number % 4 else None,
+            )
+            for number in range(100)
+        ]
+        Comment.objects.bulk_create(
+            Comment(
+                post=posts[number % 10], author=authors[number % 3],
+                text=f'Comment {number}',
+            )
+            for number in range(50)
+        )
+        for author in authors[1:]:
+            Follow.objects.create(user=authors[0], author=author)
+        post = next(post for post in posts if post.author == authors[0])
+        return authors[0], {
+            'username': authors[0].username,
+            'post_id': post.pk,
+            'slug': groups[0].slug,
+        }
+
+    def url_names(self):
+        for pattern in urls.urlpatterns:
+            if isinstance(pattern, URLPattern) and pattern.name:
+                yield pattern.name, list(pattern.pattern.converters)
+
+    def explain(self, sql):
+        """Plan steps, in the wording of SQLite 3.36 and later."""
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [
+                re.sub(r'^(SCAN|SEARCH) TABLE ', r'\1 ', row[-1])
+                for row in cursor.fetchall()
+            ]
+
+    def proposal(self, sql, table):
+        """Suggest an index on ``table`` from the statement's equality
+        filters followed by its ordering.
+        """
+        model = next(
+            (model for model in (Post, Comment, Follow, Group)
+             if model._meta.db_table == table),
+            None
+        )
+        if model is None:
+            return None
+        columns = {
+            field.column: field.name for field in model._meta.concrete_fields
+            if not field.primary_key
+        }
+        where = next(outermost(sql, r'\bWHERE\b'), None)
+        order_by = next(outermost(sql, r'\bORDER BY\b'), None)
+        if where is None or order_by is None:
+            return None
+        filters = re.findall(
+            rf'"{table}"\."(\w+)" = ', sql[where.end():order_by.start()]
+        )
+        if model._meta.pk.column in filters:
+            return None
+        fields = []
+        for column in filters:
+            if column in columns and columns[column] not in fields:
+                fields.append(columns[column])
+        for column, direction in re.findall(
+            rf'"{table}"\."(\w+)" (ASC|DESC)', sql[order_by.end():]
+        ):
+            if column in columns and columns[column] not in fields:
+                prefix = '-' if direction == 'DESC' else ''
+                fields.append(prefix + columns[column])
+        if not fields:
+            return None
+        return f'{model.__name__}: models.Index(fields={fields!r})'
+
+    def audit(self, client, kwargs):
+        findings, proposals = {}, set()
+        for name, converters in self.url_names():
+            url = reverse(
+                name, kwargs={key: kwargs[key] for key in converters}
+            )
+            with CaptureQueriesContext(connection) as queries:
+                client.get(url, {'q': QUERY})
+            for query in queries.captured_queries:
+                sql = query['sql']
+                if not sql.startswith('SELECT'):
+                    continue
+                plan = self.explain(sql)
+                main = main_table(sql)
+                single_row = f'SEARCH {main} USING INTEGER PRIMARY KEY'
+                for detail in plan:
+                    match = FULL_SCAN.match(detail)
+                    if match and 'USING' not in match.group(2):
+                        problem, table = 'SCAN', match.group(1)
+                    elif detail.startswith(TEMP_SORT) and not any(
+                        step.startswith(single_row) for step in plan
+                    ):
+                        problem, table = 'TEMP B-TREE', main
+                    else:
+                        continue
+                    findings.setdefault(name, set()).add(f'{problem} {table}')
+                    proposal = self.proposal(sql, table)
+                    if proposal:
+                        proposals.add(proposal)
+        return findings, proposals
+
+    def run(self):
+        with tempfile.TemporaryDirectory() as media_root, override_settings(
+            DEBUG=False,
+            ALLOWED_HOSTS=['testserver'],
+            CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.dummy.DummyCache'
+            }},
+            MEDIA_ROOT=media_root,
+            THUMBNAIL_WORKERS=0,
+        ):
+            try:
+                with transaction.atomic():
+                    user, kwargs = self.seed()
+                    client = Client()
+                    client.force_login(user)
+                    result = self.audit(client, kwargs)
+                    raise Rollback
+            except Rollback:
+                pass
+        return result
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('EXPLAIN QUERY PLAN есть только у SQLite')
+        findings, proposals = self.run()
+        for name, problems in sorted(findings.items()):
+            self.stdout.write(f'{name}: {", ".join(sorted(problems))}')
+        for proposal in sorted(proposals):
+            self.stdout.write(f'Предлагаемый индекс: {proposal}')
+        found = {
+            f'{name}: {problem}'
+            for name, problems in findings.items() for problem in problems
+        }
+        if options['update_baseline']:
+            with open(options['baseline'], 'w') as baseline:
+                json.dump(sorted(found), baseline, indent=2)
+                baseline.write('\n')
+        if options['ci']:
+            with open(options['baseline']) as baseline:
+                accepted = set(json.load(baseline))
+            regressions = found - accepted
+            if regressions:
+                raise CommandError(
+                    'Новые проблемы в планах запросов: '
+                    + '; '.join(sorted(regressions))
+                )
@@ -0,0 +1,127 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+ROWS = 10000
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность SQLite на чтение и запись из '
+        'нескольких потоков: настройки по умолчанию с соединением на каждый '
+        'запрос против SQLITE_PRAGMAS с постоянными соединениями. Работает '
+        'на временной базе'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--readers', type=int, default=4,
+            help='Сколько потоков читают',
+        )
+        parser.add_argument(
+            '--writers', type=int, default=2,
+            help='Сколько потоков пишут',
+        )
+        parser.add_argument(
+            '--seconds', type=float, default=5,
+            help='Сколько секунд длится каждый прогон',
+        )
+
+    def create_database(self, path, pragmas):
+        connection = sqlite3.connect(path)
+        for name, value in pragmas.items():
+            connection.execute(f'PRAGMA {name} = {value}')
+        connection.execute(
+            'CREATE TABLE post (id INTEGER PRIMARY KEY, author INTEGER, '
+            'text TEXT, pub_date REAL)'
+        )
+        connection.execute('CREATE INDEX post_pub_date ON post (pub_date)')
+        connection.executemany(
+            'INSERT INTO post (author, text, pub_date) VALUES (?, ?, ?)',
+            ((number % 100, 'Roar ' * 20, number) for number in range(ROWS))
+        )
+        connection.commit()
+        connection.close()
+
+    def worker(self, path, pragmas, persistent, operation, deadline, counts):
+        connection = None
+        done = locked = 0
+        while time.monotonic() < deadline:
+            if connection is None:
+                connection = sqlite3.connect(path)
+                for name, value in pragmas.items():
+                    connection.execute(f'PRAGMA {name} = {value}')
+            try:
+                operation(connection)
+                done += 1
+            except sqlite3.OperationalError:
+                connection.rollback()
+                locked += 1
+            if not persistent:
+                connection.close()
+                connection = None
+        if connection is not None:
+            connection.close()
+        with self.lock:
+            counts[0] += done
+            counts[1] += locked
+
+    @staticmethod
+    def read(connection):
+        connection.execute(
+            'SELECT id, author, text FROM post '
+            'ORDER BY pub_date DESC LIMIT 10'
+        ).fetchall()
+
+    @staticmethod
+    def write(connection):
+        connection.execute(
+            'INSERT INTO post (author, text, pub_date) VALUES (1, ?, ?)',
+            ('Roar ' * 20, time.time())
+        )
+        connection.commit()
+
+    def run(self, pragmas, persistent, options):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'benchmark.sqlite3')
+        self.create_database(path, pragmas)
+        reads, writes = [0, 0], [0, 0]
+        deadline = time.monotonic() + options['seconds']
+        threads = [
+            threading.Thread(target=self.worker, args=(
+                path, pragmas, persistent, operation, deadline, counts
+            ))
+            for operation, counts, number in (
+                (self.read, reads, options['readers']),
+                (self.write, writes, options['writers']),
+            )
+            for _ in range(number)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+        os.rmdir(directory)
+        return reads, writes
+
+    def handle(self, *args, **options):
+        self.lock = threading.Lock()
+        profiles = (
+            ('По умолчанию', {}, False),
+            ('SQLITE_PRAGMAS', settings.SQLITE_PRAGMAS, True),
+        )
+        seconds = options['seconds']
+        for title, pragmas, persistent in profiles:
+            reads, writes = self.run(pragmas, persistent, options)
+            self.stdout.write(
+                f'{title}: чтений {reads[0] / seconds:.0f}/с, '
+                f'записей {writes[0] / seconds:.0f}/с, '
+                f'ошибок блокировки {reads[1] + writes[1]}'
+            )
@@ -0,0 +1,29 @@
+import os
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует базу SQLite в файлы из SQLITE_REPLICAS, которые локально '
+        'изображают реплики только для чтения'
+    )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Основная база не SQLite')
+        if not settings.SQLITE_REPLICAS:
+            raise CommandError('Переменная окружения SQLITE_REPLICAS пуста')
+        connection.ensure_connection()
+        for path in settings.SQLITE_REPLICAS:
+            part = f'{path}.part'
+            target = sqlite3.connect(part)
+            try:
+                connection.connection.backup(target)
+            finally:
+                target.close()
+            os.replace(part, path)
+            self.stdout.write(f'Реплика обновлена: {path}')
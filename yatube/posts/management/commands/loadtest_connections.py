@@ -0,0 +1,127 @@
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        'Держит открытыми медленные соединения с сервером и одновременно '
+        'измеряет ответы на быстрые запросы. Запустите по одному воркеру '
+        'под WSGI (gunicorn yatube.wsgi -w 1 --threads 8) и под ASGI '
+        '(uvicorn yatube.asgi:application --workers 1) и сравните, сколько '
+        'соединений воркер держит, не переставая отвечать'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'url', help='Адрес сервера, например http://127.0.0.1:8000',
+        )
+        parser.add_argument(
+            '--connections', type=int, nargs='+', default=[8, 32, 128],
+            help='Сколько медленных соединений держать в каждом прогоне',
+        )
+        parser.add_argument(
+            '--duration', type=float, default=10,
+            help='Сколько секунд длится прогон',
+        )
+        parser.add_argument(
+            '--slow-path', default='/',
+            help='Адрес, которому медленно отправляется тело POST-запроса',
+        )
+        parser.add_argument(
+            '--probe-path', default='/about/author/',
+            help='Адрес быстрых запросов',
+        )
+        parser.add_argument(
+            '--probe-timeout', type=float, default=2,
+            help='Сколько секунд ждать ответа на быстрый запрос',
+        )
+
+    async def slow_client(self, host, port, path, duration):
+        """Send a request body one byte a second, as a slow upload does."""
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+        except OSError:
+            return False
+        length = int(duration) + 1
+        try:
+            writer.write(
+                f'POST {path} HTTP/1.1\r\nHost: {host}\r\n'
+                f'Content-Type: application/octet-stream\r\n'
+                f'Content-Length: {length}\r\n\r\n'.encode()
+            )
+            for _ in range(length):
+                await writer.drain()
+                await asyncio.sleep(1)
+                writer.write(b'x')
+            await writer.drain()
+        except OSError:
+            return False
+        finally:
+            writer.close()
+        return True
+
+    async def probe(self, host, port, path, timeout):
+        started = time.perf_counter()
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port), timeout
+            )
+        except (OSError, asyncio.TimeoutError):
+            return None
+        try:
+            writer.write(
+                f'GET {path} HTTP/1.1\r\nHost: {host}\r\n'
+                f'Connection: close\r\n\r\n'.encode()
+            )
+            status = await asyncio.wait_for(reader.readline(), timeout)
+        except (OSError, asyncio.TimeoutError):
+            return None
+        finally:
+            writer.close()
+        if not status.startswith(b'HTTP/'):
+            return None
+        return (time.perf_counter() - started) * 1000
+
+    async def run(self, host, port, connections, options):
+        duration = options['duration']
+        slow = [
+            asyncio.ensure_future(self.slow_client(
+                host, port, options['slow_path'], duration
+            ))
+            for _ in range(connections)
+        ]
+        await asyncio.sleep(0.5)
+        probes = []
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            probes.append(await self.probe(
+                host, port, options['probe_path'], options['probe_timeout']
+            ))
+            await asyncio.sleep(0.1)
+        held = sum(await asyncio.gather(*slow))
+        return held, probes
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['url'])
+        host, port = url.hostname, url.port or 80
+        for connections in options['connections']:
+            held, probes = asyncio.run(
+                self.run(host, port, connections, options)
+            )
+            answered = [latency for latency in probes if latency is not None]
+            if answered:
+                latency = (
+                    f'p50 {statistics.median(answered):.0f} мс, '
+                    f'max {max(answered):.0f} мс'
+                )
+            else:
+                latency = 'ответов нет'
+            self.stdout.write(
+                f'Медленных соединений: {connections}, удержано {held}; '
+                f'быстрых запросов отвечено {len(answered)} из '
+                f'{len(probes)}, {latency}'
+            )
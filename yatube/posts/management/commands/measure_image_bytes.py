@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from sorl.thumbnail import default
+
+from posts import thumbnails
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Считает, сколько байт картинок весит страница ленты до и после '
+        'перехода на srcset, по записям в базе (например, из фикстуры)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages', type=int, default=5,
+            help='Сколько страниц ленты измерить',
+        )
+        parser.add_argument(
+            '--widths', type=int, nargs='+', default=[360, 720, 960],
+            help='Ширина картинки в пикселях экрана, которую запрашивает '
+                 'браузер',
+        )
+
+    def file_size(self, image, geometry, options):
+        name = thumbnails.thumbnail_file(image, geometry, options).name
+        return default.storage.size(name)
+
+    def picked_width(self, width):
+        for variant_width in thumbnails.VARIANT_WIDTHS:
+            if variant_width >= width:
+                return variant_width
+        return thumbnails.VARIANT_WIDTHS[-1]
+
+    def measure(self, posts, widths):
+        sizes = {'jpeg': 0, **{width: 0 for width in widths}}
+        variants = {
+            width: (geometry, options)
+            for format_, width, geometry, options in thumbnails.variants()
+            if format_ == next(iter(thumbnails.VARIANT_FORMATS))
+        }
+        for post in posts:
+            sizes['jpeg'] += self.file_size(
+                post.image, thumbnails.GEOMETRY, thumbnails.OPTIONS
+            )
+            for width in widths:
+                sizes[width] += self.file_size(
+                    post.image, *variants[self.picked_width(width)]
+                )
+        return sizes
+
+    def handle(self, *args, **options):
+        posts = list(
+            Post.objects.exclude(image='').only('image').order_by(
+                '-pub_date', '-pk'
+            )[:options['pages'] * settings.PAGES_AMOUNT]
+        )
+        thumbnails.render([
+            post.image.name for post in posts
+            if thumbnails.is_pending(post.image)
+        ])
+        widths = options['widths']
+        pages = [
+            posts[start:start + settings.PAGES_AMOUNT]
+            for start in range(0, len(posts), settings.PAGES_AMOUNT)
+        ]
+        for number, page in enumerate(pages, start=1):
+            sizes = self.measure(page, widths)
+            after = ', '.join(
+                f'{width}px: {sizes[width]}' for width in widths
+            )
+            self.stdout.write(
+                f'Страница {number}: JPEG {sizes["jpeg"]} байт, '
+                f'srcset {after}'
+            )
@@ -0,0 +1,78 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from sorl.thumbnail import delete
+from sorl.thumbnail.images import ImageFile
+
+from posts import generations
+from posts.models import Post
+from posts.storage import is_hashed
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит картинки записей в хранилище с адресами по содержимому '
+        'и обновляет пути в базе'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Сколько файлов переносить одновременно',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Сколько записей обновлять за одну транзакцию',
+        )
+
+    def handle(self, *args, **options):
+        storage = Post._meta.get_field('image').storage
+        posts = Post.objects.exclude(image='').exclude(
+            image__isnull=True
+        ).only('image', 'author', 'group').order_by('pk')
+        last_pk = 0
+        moved = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            while True:
+                batch = list(
+                    posts.filter(pk__gt=last_pk)[:options['batch_size']]
+                )
+                if not batch:
+                    break
+                last_pk = batch[-1].pk
+                legacy = [
+                    post for post in batch if not is_hashed(post.image.name)
+                ]
+                names = list({post.image.name for post in legacy})
+                adopted = dict(zip(names, executor.map(storage.adopt, names)))
+                changed = []
+                for post in legacy:
+                    hashed = adopted[post.image.name]
+                    if hashed is not None:
+                        post.image = hashed
+                        post.revision = F('revision') + 1
+                        changed.append(post)
+                with transaction.atomic():
+                    Post.objects.bulk_update(changed, ['image', 'revision'])
+                still_used = set(
+                    Post.objects.filter(image__in=names).values_list(
+                        'image', flat=True
+                    )
+                )
+                released = [
+                    name for name, hashed in adopted.items()
+                    if hashed is not None and name not in still_used
+                ]
+                list(executor.map(storage.delete, released))
+                for name in released:
+                    delete(ImageFile(name, storage), delete_file=False)
+                if changed:
+                    generations.bump_posts(changed)
+                moved += len(changed)
+        self.stdout.write(
+            f'Перенесено картинок: {moved}. Миниатюры для новых путей '
+            f'создаст pregenerate_thumbnails'
+        )
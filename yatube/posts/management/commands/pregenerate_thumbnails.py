@@ -0,0 +1,69 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from posts import generations, thumbnails
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Создаёт миниатюры картинок записей, которых ещё нет в хранилище'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Сколько процессов создают миниатюры',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Сколько картинок отдавать процессу за раз',
+        )
+
+    def pending_batches(self, batch_size):
+        posts = Post.objects.exclude(image='').only('image', 'author', 'group')
+        last_pk = 0
+        while True:
+            batch = list(posts.filter(pk__gt=last_pk).order_by('pk')[
+                :batch_size
+            ])
+            if not batch:
+                return
+            last_pk = batch[-1].pk
+            thumbnails.prefetch(batch)
+            pending = [post for post in batch if post.picture['pending']]
+            if pending:
+                yield pending
+
+    def handle(self, *args, **options):
+        workers = max(options['workers'] or 1, 1)
+        batches = self.pending_batches(options['batch_size'])
+        total = 0
+        if workers == 1:
+            for batch in batches:
+                thumbnails.render([post.image.name for post in batch])
+                total += self.finish(batch)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                running = deque()
+                for batch in batches:
+                    # Children are forked on submit and must not inherit
+                    # the connection that read the batch.
+                    connections.close_all()
+                    running.append((batch, executor.submit(
+                        thumbnails.render,
+                        [post.image.name for post in batch]
+                    )))
+                    if len(running) > workers:
+                        total += self.finish(*running.popleft())
+                while running:
+                    total += self.finish(*running.popleft())
+        self.stdout.write(f'Создано миниатюр: {total}')
+
+    def finish(self, batch, future=None):
+        if future is not None:
+            future.result()
+        generations.bump_posts(batch)
+        return len(batch)
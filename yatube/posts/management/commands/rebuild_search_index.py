@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from posts.search import SEARCH_TABLE, search_available
+
+
+class Command(BaseCommand):
+    help = (
+        'Перестраивает полнотекстовый индекс записей в одной транзакции, '
+        'поиск до её завершения работает по старому индексу'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Сколько записей читать и индексировать за один запрос',
+        )
+
+    def handle(self, *args, **options):
+        if not search_available():
+            raise CommandError('Полнотекстовый индекс есть только в SQLite')
+        batch_size = options['batch_size']
+        total = 0
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) "
+                f"VALUES ('delete-all')"
+            )
+            last_pk = 0
+            while True:
+                cursor.execute(
+                    'SELECT id, text FROM posts_post WHERE id > %s '
+                    'ORDER BY id LIMIT %s',
+                    [last_pk, batch_size]
+                )
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                cursor.executemany(
+                    f'INSERT INTO {SEARCH_TABLE}(rowid, text) '
+                    f'VALUES (%s, %s)',
+                    rows
+                )
+                total += len(rows)
+                last_pk = rows[-1][0]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) "
+                f"VALUES ('optimize')"
+            )
+        self.stdout.write(f'Проиндексировано записей: {total}')
@@ -0,0 +1,148 @@
+"""Access-checked delivery of uploaded media.
+
+The view only decides whether a file may be served. The bytes are sent by
+the front server through ``X-Accel-Redirect`` or ``X-Sendfile`` when
+``MEDIA_SENDFILE`` names one. Otherwise they are streamed from Python with
+byte ranges, and WSGI servers with a ``wsgi.file_wrapper`` such as gunicorn
+send them with ``sendfile``.
+
+The view is async: under ASGI the checks run in the ORM pool and a worker
+holds no thread while the front server or the client takes the bytes.
+Django 3.2 still reads a streamed file on the event loop, so ASGI
+deployments should set ``MEDIA_SENDFILE``.
+"""
+import mimetypes
+import os
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from sorl.thumbnail.conf import settings as thumbnail_settings
+
+from .async_orm import run_sync
+from .models import Post
+from .storage import is_hashed
+
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'public, max-age=3600'
+
+
+class RangeFile:
+    """Read-only view of ``length`` bytes of ``file`` from ``start``.
+
+    ``fileno`` is kept so ``sendfile`` can send from the current offset;
+    servers limit it to the ``Content-Length`` of the response.
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """Return ``(start, end)`` of a single byte range, ``None`` for the
+    whole file or ``False`` when the range cannot be satisfied.
+    """
+    match = RANGE.match(header.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start > end or start >= size:
+        return False
+    return start, end
+
+
+def is_public(name):
+    """Thumbnails and images of existing posts may be served."""
+    if name.startswith(thumbnail_settings.THUMBNAIL_PREFIX):
+        return True
+    return Post.objects.filter(image=name).exists()
+
+
+def cache_control(name):
+    if is_hashed(name) or name.startswith(
+        thumbnail_settings.THUMBNAIL_PREFIX
+    ):
+        return IMMUTABLE
+    return REVALIDATE
+
+
+def resolve(name):
+    """Return the path of the servable file ``name`` or raise ``Http404``."""
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, name)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path) or not is_public(name):
+        raise Http404
+    return full_path
+
+
+async def serve_media(request, path):
+    name = posixpath.normpath(path).lstrip('/')
+    full_path = await run_sync(request, resolve, name)
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    sendfile = settings.MEDIA_SENDFILE
+    if sendfile:
+        response = HttpResponse(content_type=content_type)
+        if sendfile == 'x-accel-redirect':
+            response['X-Accel-Redirect'] = (
+                settings.MEDIA_ACCEL_PREFIX + quote(name)
+            )
+        else:
+            response['X-Sendfile'] = full_path
+    else:
+        response = await run_sync(
+            request, stream, request, full_path, content_type
+        )
+    response['Cache-Control'] = cache_control(name)
+    return response
+
+
+def stream(request, full_path, content_type):
+    size = os.path.getsize(full_path)
+    byte_range = parse_range(request.META.get('HTTP_RANGE', ''), size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    file = open(full_path, 'rb')
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = byte_range
+        response = FileResponse(
+            RangeFile(file, start, end - start + 1),
+            status=206,
+            content_type=content_type,
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = end - start + 1
+    response['Accept-Ranges'] = 'bytes'
+    return response
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.13 on 2026-10-17 22:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0016_userstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='revision',
+            field=models.PositiveIntegerField(default=1, editable=False, verbose_name='Редакция'),
+        ),
+    ]
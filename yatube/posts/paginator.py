@@ -0,0 +1,153 @@
+from django.core import signing
+from django.core.paginator import Page, Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Max, Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+
+class CursorPaginator(Paginator):
+    """Keyset paginator over a ``(datetime, pk)`` ordering.
+
+    Pages are addressed by a signed cursor holding the sort key of the
+    boundary row and the number of the page it leads to, so every page
+    costs one indexed range read and no ``COUNT(*)``. The plain
+    ``?page=N`` interface of ``Paginator`` stays available for old links.
+    Subclasses with another kind of leading key override ``dump_key`` and
+    ``load_key``.
+    """
+    ordering = ('-pub_date', '-pk')
+    salt = 'posts.paginator.cursor'
+
+    def __init__(self, object_list, per_page, ordering=None, **kwargs):
+        if ordering is not None:
+            self.ordering = tuple(ordering)
+        if hasattr(object_list, 'order_by'):
+            object_list = object_list.order_by(*self.ordering)
+        super().__init__(object_list, per_page, **kwargs)
+
+    @property
+    def keys(self):
+        return tuple(field.lstrip('-') for field in self.ordering)
+
+    def get_request_page(self, request):
+        page_number = request.GET.get('page')
+        if page_number is not None and 'cursor' not in request.GET:
+            return self.get_page(page_number)
+        return self.get_cursor_page(request.GET.get('cursor'))
+
+    def get_cursor_page(self, cursor):
+        position, backwards, number = self.decode_cursor(cursor)
+        rows = list(self.get_window(position, backwards, self.per_page + 1))
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+            has_previous, has_next = has_more, True
+        else:
+            has_previous, has_next = position is not None, has_more
+        page = Page(rows, number, self)
+        page.is_cursor = True
+        page.cursor = cursor if position is not None else ''
+        page.next_cursor = (
+            self.encode_cursor(rows[-1], False, number + 1)
+            if has_next and rows else ''
+        )
+        page.previous_cursor = (
+            self.encode_cursor(rows[0], True, max(number - 1, 1))
+            if has_previous and rows else ''
+        )
+        return page
+
+    def get_window(self, position, backwards, limit):
+        queryset = self.object_list
+        if position is not None:
+            queryset = queryset.filter(self.keyset_filter(position, backwards))
+        if backwards:
+            queryset = queryset.reverse()
+        return queryset[:limit]
+
+    def keyset_filter(self, position, backwards, keys=None):
+        first, second = keys or self.keys
+        lookup = 'gt' if backwards else 'lt'
+        first_value, second_value = position
+        return (
+            Q(**{f'{first}__{lookup}': first_value})
+            | Q(**{first: first_value, f'{second}__{lookup}': second_value})
+        )
+
+    def get_position(self, obj):
+        first, second = self.keys
+        return getattr(obj, first), getattr(obj, second)
+
+    def dump_key(self, value):
+        return value.isoformat()
+
+    def load_key(self, value):
+        moment = parse_datetime(value)
+        if moment is None:
+            raise ValueError(value)
+        return moment
+
+    @cached_property
+    def signer(self):
+        return signing.Signer(salt=self.salt)
+
+    def encode_cursor(self, obj, backwards, number):
+        key, pk = self.get_position(obj)
+        return self.signer.sign_object(
+            [self.dump_key(key), pk, int(backwards), number]
+        )
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return None, False, 1
+        try:
+            key, pk, backwards, number = self.signer.unsign_object(cursor)
+            key = self.load_key(key)
+            pk = int(pk)
+            number = max(int(number), 1)
+        except (signing.BadSignature, TypeError, ValueError):
+            return None, False, 1
+        return (key, pk), bool(backwards), number
+
+
+def estimate_rows(queryset):
+    """Cheap row estimate of an unfiltered table, ``None`` if unknown.
+
+    ``sqlite_stat1`` is only as fresh as the last ``ANALYZE``, so the largest
+    primary key keeps the estimate from falling below the rows added since
+    and hiding the last pages.
+    """
+    estimates = [queryset.aggregate(last=Max('pk'))['last']]
+    connection = connections[queryset.db]
+    if connection.vendor == 'sqlite':
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1',
+                    [queryset.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+        except DatabaseError:
+            row = None
+        if row:
+            estimates.append(int(row[0].split()[0]))
+    estimates = [estimate for estimate in estimates if estimate is not None]
+    return max(estimates) if estimates else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Admin paginator that never counts a whole table.
+
+    Unfiltered changelists use the table statistics, filtered ones count the
+    matching rows so that every page of them stays reachable.
+    """
+
+    @cached_property
+    def count(self):
+        if not self.object_list.query.where:
+            estimate = estimate_rows(self.object_list)
+            if estimate is not None:
+                return estimate
+        return self.object_list.order_by().count()
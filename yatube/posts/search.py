@@ -0,0 +1,91 @@
+import re
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Post
+from .paginator import CursorPaginator
+
+SEARCH_TABLE = 'posts_post_fts'
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+
+WINDOW_SQL = f"""
+    SELECT rowid, rank,
+           snippet({SEARCH_TABLE}, 0, %s, %s, '…', 16)
+    FROM {SEARCH_TABLE}
+    WHERE {SEARCH_TABLE} MATCH %s {{keyset}}
+    ORDER BY rank {{direction}}, rowid {{direction}}
+    LIMIT %s
+"""
+
+
+def search_available():
+    return connection.vendor == 'sqlite'
+
+
+def match_expression(query):
+    """Turn free text into an FTS5 query matching every word of it."""
+    words = re.findall(r'\w+', query)
+    return ' '.join('"{}"'.format(word.replace('"', '""')) for word in words)
+
+
+def matching_ids(query):
+    return RawSQL(
+        f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s',
+        [match_expression(query)]
+    )
+
+
+def highlight(snippet):
+    return mark_safe(
+        escape(snippet)
+        .replace(HIGHLIGHT_START, '<mark>')
+        .replace(HIGHLIGHT_END, '</mark>')
+    )
+
+
+class SearchPaginator(CursorPaginator):
+    """Cursor paginator over FTS5 matches ordered by ``bm25`` rank."""
+
+    def __init__(self, query, per_page, **kwargs):
+        self.match = match_expression(query)
+        self.salt = f'{CursorPaginator.salt}:search:{self.match}'
+        super().__init__(Post.objects.none(), per_page, **kwargs)
+
+    def dump_key(self, value):
+        return value
+
+    def load_key(self, value):
+        return float(value)
+
+    def get_position(self, post):
+        return post.rank, post.pk
+
+    def get_window(self, position, backwards, limit):
+        if not self.match:
+            return []
+        keyset = ''
+        params = [HIGHLIGHT_START, HIGHLIGHT_END, self.match]
+        if position is not None:
+            sign = '<' if backwards else '>'
+            keyset = f'AND (rank {sign} %s OR (rank = %s AND rowid {sign} %s))'
+            rank, pk = position
+            params += [rank, rank, pk]
+        sql = WINDOW_SQL.format(
+            keyset=keyset, direction='DESC' if backwards else 'ASC'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params + [limit])
+            matches = cursor.fetchall()
+        posts = Post.objects.feed().in_bulk([pk for pk, _, _ in matches])
+        window = []
+        for pk, rank, snippet in matches:
+            post = posts.get(pk)
+            if post is not None:
+                post.rank = rank
+                post.snippet = highlight(snippet)
+                window.append(post)
+        return window
@@ -0,0 +1,123 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import generations, stats, storage, timeline
+from .models import Comment, Follow, Post, User, UserStats
+
+
+@receiver(post_save, sender=User)
+def create_stats(sender, instance, created, **kwargs):
+    if created:
+        UserStats.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=Post)
+def count_new_post(sender, instance, created, **kwargs):
+    if created:
+        stats.bump(instance.author_id, 'posts_count', 1)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    stats.bump(instance.author_id, 'posts_count', -1)
+
+
+@receiver(post_save, sender=Follow)
+def count_new_follow(sender, instance, created, **kwargs):
+    if created:
+        stats.bump(instance.author_id, 'followers_count', 1)
+        stats.bump(instance.user_id, 'following_count', 1)
+
+
+@receiver(post_delete, sender=Follow)
+def count_deleted_follow(sender, instance, **kwargs):
+    stats.bump(instance.author_id, 'followers_count', -1)
+    stats.bump(instance.user_id, 'following_count', -1)
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post(sender, instance, created, **kwargs):
+    if created:
+        timeline.fan_out(instance)
+
+
+@receiver(post_save, sender=Follow)
+def backfill_timeline(sender, instance, created, **kwargs):
+    if created:
+        timeline.backfill(instance)
+
+
+@receiver(post_delete, sender=Follow)
+def trim_timeline(sender, instance, **kwargs):
+    timeline.trim(instance)
+    timeline.backfill_followers(instance.author_id)
+
+
+@receiver(pre_save, sender=Post)
+def start_revision(sender, instance, **kwargs):
+    if instance.pk is not None:
+        (
+            instance.previous_group_id,
+            instance.revision,
+            instance.previous_image,
+        ) = Post.objects.filter(pk=instance.pk).values_list(
+            'group', 'revision', 'image'
+        ).first() or (None, 0, None)
+        instance.revision += 1
+
+
+@receiver(post_save, sender=Post)
+def release_replaced_image(sender, instance, **kwargs):
+    previous_image = getattr(instance, 'previous_image', None)
+    if previous_image and previous_image != instance.image.name:
+        storage.release(Post._meta.get_field('image'), previous_image)
+
+
+@receiver(pre_save, sender=Post)
+def remember_uploaded_image(sender, instance, **kwargs):
+    image = instance.image
+    instance.uploaded_image = (
+        image.file if image and not image._committed else None
+    )
+
+
+@receiver(post_save, sender=Post)
+def keep_uploaded_image(sender, instance, **kwargs):
+    uploaded_image = getattr(instance, 'uploaded_image', None)
+    if uploaded_image is not None:
+        storage.keep(
+            Post._meta.get_field('image'), instance.image.name, uploaded_image
+        )
+
+
+@receiver(post_delete, sender=Post)
+def release_deleted_image(sender, instance, **kwargs):
+    storage.release(Post._meta.get_field('image'), instance.image.name)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_feeds(sender, instance, **kwargs):
+    generations.bump_post(
+        instance, getattr(instance, 'previous_group_id', None)
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_feeds(sender, instance, **kwargs):
+    post = Post.objects.only('author', 'group').filter(
+        pk=instance.post_id
+    ).first()
+    if post is not None:
+        generations.bump_post(post)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_follow_feed(sender, instance, **kwargs):
+    generations.bump(
+        generations.follow_scope(instance.user_id),
+        generations.profile_scope(instance.user_id),
+        generations.profile_scope(instance.author_id),
+    )
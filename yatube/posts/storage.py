@@ -0,0 +1,143 @@
+import hashlib
+import os
+import posixpath
+import re
+import uuid
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.utils.deconstruct import deconstructible
+from sorl.thumbnail import delete
+from sorl.thumbnail.images import ImageFile
+
+HASHED_NAME = re.compile(
+    r'(^|/)[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}(\.\w+)?$'
+)
+
+
+def is_hashed(name):
+    return bool(name) and HASHED_NAME.search(name) is not None
+
+
+def release(field, name):
+    """Delete the file ``name`` of ``field`` once no row references it.
+
+    Only content-addressed names are shared, so only they are counted; the
+    file goes together with its thumbnails after the transaction commits.
+    An upload of the same content may reuse the file while it is released,
+    so the file is moved aside first and put back if a reference appeared
+    meanwhile. A reference committed after that is handled by ``keep``.
+    """
+    if not is_hashed(name):
+        return
+
+    def is_referenced():
+        return field.model._default_manager.filter(
+            **{field.name: name}
+        ).exists()
+
+    def delete_unreferenced():
+        if is_referenced():
+            return
+        aside = field.storage.set_aside(name)
+        if aside is None:
+            return
+        if is_referenced():
+            field.storage.put_back(aside, name)
+            return
+        field.storage.delete(aside)
+        delete(ImageFile(name, field.storage), delete_file=False)
+
+    transaction.on_commit(delete_unreferenced)
+
+
+def keep(field, name, content):
+    """Store ``content`` as ``name`` again if a release deleted it meanwhile.
+
+    An upload finding its content already stored skips writing it, and a
+    release that checked for references before the upload committed may
+    delete that file. After the commit the file is written again from the
+    uploaded ``content``.
+    """
+    if not is_hashed(name):
+        return
+
+    def restore():
+        if content.closed or field.storage.exists(name):
+            return
+        content.seek(0)
+        field.storage.store(name, content)
+
+    transaction.on_commit(restore)
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Stores files under the SHA-256 of their content.
+
+    ``posts/photo.jpg`` is saved as ``posts/ab/cd/abcd….jpg``, so identical
+    uploads share one file and no directory grows past 256 entries. Files
+    are never overwritten or renamed; the callers release a name once no
+    row references it.
+    """
+
+    def hashed_name(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        hexdigest = digest.hexdigest()
+        directory = posixpath.dirname(name.replace('\\', '/'))
+        extension = os.path.splitext(name)[1].lower()
+        return posixpath.join(
+            directory, hexdigest[:2], hexdigest[2:4], hexdigest + extension
+        )
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        if not self.exists(name):
+            self.store(name, content)
+        return name
+
+    def store(self, name, content):
+        """Write ``content`` next to ``name`` and atomically move it there.
+
+        Concurrent uploads of the same content each write their own part
+        file, the last rename wins with identical bytes.
+        """
+        part = super()._save(f'{name}.{uuid.uuid4().hex}.part', content)
+        os.replace(self.path(part), self.path(name))
+
+    def set_aside(self, name):
+        """Move ``name`` to a unique name, ``None`` if it is missing."""
+        aside = f'{name}.{uuid.uuid4().hex}.released'
+        try:
+            os.replace(self.path(name), self.path(aside))
+        except FileNotFoundError:
+            return None
+        return aside
+
+    def put_back(self, aside, name):
+        os.replace(self.path(aside), self.path(name))
+
+    def adopt(self, name):
+        """Store a copy of the file saved as ``name`` at its content address.
+
+        Returns the new name or ``None`` when the file is missing. The old
+        file is left for the caller to delete once nothing references it.
+        """
+        if not self.exists(name):
+            return None
+        with self.open(name) as content:
+            hashed = self.hashed_name(name, content)
+            if not self.exists(hashed):
+                self.store(hashed, content)
+        return hashed
+
+
+post_image_storage = ContentAddressedStorage()
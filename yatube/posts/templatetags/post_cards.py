@@ -0,0 +1,109 @@
+import hashlib
+import re
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+from .. import thumbnails
+
+register = template.Library()
+
+EDIT_SLOT = '<!-- post-edit-slot:{} -->'
+EDIT_SLOT_PATTERN = re.compile(r'<!-- post-edit-slot:(\d+) -->')
+
+
+def card_key(post):
+    return f'posts:card:{post.pk}:{post.revision}:{post.comments_count}'
+
+
+@register.filter
+def cards_version(posts):
+    """Key of the cards of ``posts``, for fragments no generation covers."""
+    return hashlib.md5(
+        ' '.join(card_key(post) for post in posts).encode()
+    ).hexdigest()
+
+
+@register.simple_tag
+def post_cards(posts):
+    """Render ``post_card.html`` for ``posts`` through the card cache.
+
+    Cards are cached without the viewer's edit button and fetched with one
+    ``get_many``; only misses are rendered and written back together, after
+    their thumbnails are read in one batch. Cards still showing a thumbnail
+    placeholder are not cached. The edit buttons are left as slots for an
+    enclosing ``{% edit_buttons %}`` to fill.
+    """
+    posts = list(posts)
+    keys = [card_key(post) for post in posts]
+    cards = cache.get_many(keys)
+    misses = {}
+    card_template = get_template('posts/include/post_card.html')
+    thumbnails.prefetch(
+        post for key, post in zip(keys, posts) if key not in cards
+    )
+    pending = set()
+    for key, post in zip(keys, posts):
+        if key not in cards:
+            misses[key] = card_template.render({
+                'post': post,
+                'edit_slot': mark_safe(EDIT_SLOT.format(post.pk)),
+            })
+            if post.picture['pending']:
+                pending.add(key)
+    if misses:
+        cache.set_many(
+            {key: card for key, card in misses.items() if key not in pending},
+            timeout=settings.FEED_CACHE_TIMEOUT
+        )
+        cards.update(misses)
+    return mark_safe('\n'.join(cards[key] for key in keys))
+
+
+class EditButtonsNode(template.Node):
+    def __init__(self, nodelist, posts):
+        self.nodelist = nodelist
+        self.posts = posts
+
+    def render(self, context):
+        content = self.nodelist.render(context)
+        user = context.get('user')
+        own_posts = {}
+        if user is not None and user.is_authenticated:
+            own_posts = {
+                post.pk: post for post in self.posts.resolve(context)
+                if post.author_id == user.pk
+            }
+        button_template = get_template('posts/include/post_edit_button.html')
+
+        def fill(match):
+            post = own_posts.get(int(match.group(1)))
+            return button_template.render({'post': post}) if post else ''
+
+        return mark_safe(EDIT_SLOT_PATTERN.sub(fill, content))
+
+
+@register.tag
+def edit_buttons(parser, token):
+    """Fill the edit slots of the cards inside with the viewer's buttons.
+
+    Usage::
+
+        {% edit_buttons page %}
+          {% cache ... %}{% post_cards page %}{% endcache %}
+        {% endedit_buttons %}
+
+    Everything inside is the same for every viewer, so it can be cached
+    as a whole.
+    """
+    bits = token.split_contents()
+    if len(bits) != 2:
+        raise template.TemplateSyntaxError(
+            f'{bits[0]} принимает один аргумент: список постов'
+        )
+    nodelist = parser.parse(('endedit_buttons',))
+    parser.delete_first_token()
+    return EditButtonsNode(nodelist, parser.compile_filter(bits[1]))
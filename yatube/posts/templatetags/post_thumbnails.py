@@ -0,0 +1,30 @@
+from django import template
+
+from .. import thumbnails
+
+register = template.Library()
+
+SIZES = (
+    f'(max-width: {thumbnails.VARIANT_WIDTHS[-1]}px) 100vw, '
+    f'{thumbnails.VARIANT_WIDTHS[-1]}px'
+)
+
+
+@register.simple_tag
+def prefetch_pictures(posts):
+    """Read the thumbnails of all ``posts`` before they are rendered."""
+    thumbnails.prefetch(posts)
+    return ''
+
+
+@register.inclusion_tag('posts/include/post_picture.html')
+def post_picture(post):
+    """Render the pregenerated thumbnail of ``post`` as ``<picture>``.
+
+    Nothing is resized while rendering: a placeholder is shown until the
+    worker pool has stored the thumbnail, and the srcset variants are listed
+    once they are stored. Posts passed to ``prefetch_pictures`` are served
+    from memory.
+    """
+    picture = getattr(post, 'picture', None) or thumbnails.picture(post.image)
+    return dict(picture, sizes=SIZES)
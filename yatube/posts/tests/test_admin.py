@@ -0,0 +1,107 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Follow, Post
+from ..paginator import EstimatedCountPaginator
+
+User = get_user_model()
+
+
+class AdminChangelistTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(username='Admin')
+        cls.author = User.objects.create_user(username='LionUser')
+        cls.changelists = (
+            reverse('admin:posts_post_changelist'),
+            reverse('admin:posts_comment_changelist'),
+            reverse('admin:posts_follow_changelist'),
+        )
+
+    def setUp(self):
+        self.admin_client = Client()
+        self.admin_client.force_login(AdminChangelistTests.admin)
+
+    def add_rows(self, amount):
+        for number in range(amount):
+            user = User.objects.create_user(
+                username=f'LionUserFan{User.objects.count()}'
+            )
+            post = Post.objects.create(
+                text=f'Some text about lions {number}', author=user
+            )
+            Comment.objects.create(post=post, author=user, text='Roar')
+            Follow.objects.create(
+                user=user, author=AdminChangelistTests.author
+            )
+
+    def count_queries(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.admin_client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return [query['sql'] for query in queries.captured_queries]
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        self.add_rows(2)
+        few_rows = {
+            url: self.count_queries(url)
+            for url in AdminChangelistTests.changelists
+        }
+        self.add_rows(10)
+        for url in AdminChangelistTests.changelists:
+            with self.subTest(url=url):
+                self.assertEqual(
+                    len(self.count_queries(url)), len(few_rows[url])
+                )
+
+    def test_changelists_skip_full_count(self):
+        self.add_rows(2)
+        for url in AdminChangelistTests.changelists:
+            with self.subTest(url=url):
+                for sql in self.count_queries(url):
+                    self.assertNotRegex(
+                        sql, r'^SELECT COUNT\(\*\) AS "__count" FROM "\w+"$'
+                    )
+
+    def test_stale_statistics_keep_last_page_reachable(self):
+        self.add_rows(2)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.add_rows(5)
+        paginator = EstimatedCountPaginator(Post.objects.order_by('pk'), 2)
+        self.assertGreaterEqual(paginator.count, Post.objects.count())
+        self.assertIn(
+            Post.objects.latest('pk'),
+            paginator.page(paginator.num_pages).object_list
+        )
+
+    def test_fk_search_uses_exact_lookups(self):
+        self.add_rows(3)
+        fan = Follow.objects.filter(
+            author=AdminChangelistTests.author
+        ).first().user
+        response = self.admin_client.get(
+            reverse('admin:posts_comment_changelist'), {'q': fan.username}
+        )
+        self.assertEqual(
+            [comment.author for comment in response.context['cl'].result_list],
+            [fan]
+        )
+        post = Post.objects.filter(author=fan).get()
+        response = self.admin_client.get(
+            reverse('admin:posts_comment_changelist'), {'q': str(post.pk)}
+        )
+        self.assertEqual(
+            [comment.post for comment in response.context['cl'].result_list],
+            [post]
+        )
+        response = self.admin_client.get(
+            reverse('admin:posts_follow_changelist'),
+            {'q': AdminChangelistTests.author.username}
+        )
+        self.assertEqual(len(response.context['cl'].result_list), 3)
+        self.assertEqual(response.context['cl'].result_count, 3)
@@ -0,0 +1,129 @@
+from http import HTTPStatus
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import (
+    AsyncClient, Client, LiveServerTestCase, TestCase, TransactionTestCase
+)
+from django.urls import reverse
+from django.utils.module_loading import import_string
+
+from .. import async_orm
+from ..models import Comment, Follow, Post, UserStats
+
+User = get_user_model()
+
+
+class AsyncViewsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='LionUser')
+        cls.follower = User.objects.create_user(username='LionUserFan')
+        cls.post = Post.objects.create(text='Roar', author=cls.author)
+        Comment.objects.create(
+            post=cls.post, author=cls.follower, text='Nice roar'
+        )
+        cls.url_follow = reverse(
+            'profile_follow', kwargs={'username': cls.author.username}
+        )
+        cls.url_unfollow = reverse(
+            'profile_unfollow', kwargs={'username': cls.author.username}
+        )
+
+    def setUp(self):
+        self.follower_client = Client()
+        self.follower_client.force_login(AsyncViewsTests.follower)
+
+    def test_follow_and_unfollow(self):
+        self.follower_client.get(AsyncViewsTests.url_follow)
+        self.assertTrue(Follow.objects.filter(
+            user=AsyncViewsTests.follower, author=AsyncViewsTests.author
+        ).exists())
+        self.follower_client.get(AsyncViewsTests.url_unfollow)
+        self.assertFalse(Follow.objects.exists())
+
+    def test_guest_is_sent_to_login(self):
+        for url in (AsyncViewsTests.url_follow, AsyncViewsTests.url_unfollow):
+            with self.subTest(url=url):
+                response = Client().get(url)
+                self.assertRedirects(
+                    response, f'{reverse("login")}?next={url}'
+                )
+
+    def test_profile_stats(self):
+        self.follower_client.get(AsyncViewsTests.url_follow)
+        response = self.follower_client.get(reverse(
+            'profile_stats', kwargs={'username': AsyncViewsTests.author}
+        ))
+        self.assertEqual(
+            response.json(), {'posts': 1, 'followers': 1, 'following': 0}
+        )
+
+    def test_profile_stats_without_counters_row(self):
+        UserStats.objects.filter(user=AsyncViewsTests.follower).delete()
+        response = self.follower_client.get(reverse(
+            'profile_stats', kwargs={'username': AsyncViewsTests.follower}
+        ))
+        self.assertEqual(
+            response.json(), {'posts': 0, 'followers': 0, 'following': 0}
+        )
+        response = self.follower_client.get(reverse(
+            'profile_stats', kwargs={'username': 'nobody'}
+        ))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_post_stats(self):
+        response = self.follower_client.get(reverse('post_stats', kwargs={
+            'username': AsyncViewsTests.author,
+            'post_id': AsyncViewsTests.post.pk,
+        }))
+        self.assertEqual(response.json(), {'comments': 1})
+        response = self.follower_client.get(reverse('post_stats', kwargs={
+            'username': AsyncViewsTests.follower,
+            'post_id': AsyncViewsTests.post.pk,
+        }))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+
+class AsgiOrmPoolTests(TransactionTestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username='LionUser')
+
+    async def test_asgi_requests_use_orm_pool(self):
+        with mock.patch.object(
+            async_orm, 'get_executor', wraps=async_orm.get_executor
+        ) as get_executor:
+            response = await AsyncClient().get(reverse(
+                'profile_stats', kwargs={'username': self.author.username}
+            ))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json()['posts'], 0)
+        get_executor.assert_called_once()
+
+    async def test_asgi_requests_pass_async_middleware(self):
+        response = await AsyncClient().get(reverse(
+            'profile_stats', kwargs={'username': self.author.username}
+        ))
+        self.assertIn('db;dur=', response['Server-Timing'])
+
+    def test_middleware_is_async_capable(self):
+        for path in settings.MIDDLEWARE:
+            with self.subTest(middleware=path):
+                self.assertTrue(
+                    getattr(import_string(path), 'async_capable', False)
+                )
+
+
+class LoadTestCommandTests(LiveServerTestCase):
+    def test_reports_probe_latency(self):
+        out = StringIO()
+        call_command(
+            'loadtest_connections', self.live_server_url,
+            connections=[2], duration=1, stdout=out,
+        )
+        self.assertIn('Медленных соединений: 2', out.getvalue())
+        self.assertIn('p50', out.getvalue())
@@ -0,0 +1,89 @@
+import os
+import time
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from benchmarks.corpus import PASSWORD, SCALES, Generator
+
+from ..models import Group, Post, UserStats
+
+# Cold-cache budgets of the pages a reader sees most. A regression or a
+# deliberate change is a one-line diff here. Query counts are always
+# checked; times only with LATENCY_BUDGETS=1 in the environment, on a
+# machine quiet enough for them to mean something.
+# (url name, url arguments, method, client, max queries, max milliseconds)
+BUDGETS = (
+    ('index', (), 'get', 'reader', 3, 200),
+    ('group_posts', ('slug',), 'get', 'reader', 5, 200),
+    ('profile', ('username',), 'get', 'reader', 5, 200),
+    ('post', ('username', 'post_id'), 'get', 'reader', 6, 200),
+    ('follow_index', (), 'get', 'reader', 6, 200),
+    ('add_comment', ('username', 'post_id'), 'get', 'reader', 5, 200),
+    ('add_comment', ('username', 'post_id'), 'post', 'reader', 8, 200),
+    ('login', (), 'get', 'guest', 0, 100),
+    ('login', (), 'post', 'guest', 6, 1000),
+    ('signup', (), 'get', 'guest', 0, 100),
+    ('password_reset', (), 'get', 'guest', 0, 100),
+)
+CHECK_LATENCY = os.environ.get('LATENCY_BUDGETS') == '1'
+RUNS = 3
+
+
+class ViewBudgetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        Generator(SCALES['10k']).generate()
+        cls.reader = UserStats.objects.order_by(
+            '-following_count'
+        ).select_related('user').first().user
+        group = Group.objects.annotate(
+            total=Count('groups')
+        ).order_by('-total').first()
+        post = Post.objects.select_related('author').annotate(
+            total=Count('comments')
+        ).order_by('-total').first()
+        cls.kwargs = {
+            'slug': group.slug,
+            'username': post.author.username,
+            'post_id': post.pk,
+        }
+        cls.data = {
+            'add_comment': {'text': 'Roar back'},
+            'login': {'username': cls.reader.username, 'password': PASSWORD},
+        }
+
+    def measure(self, name, arguments, method, client):
+        """Return the queries and the best time of cold-cache requests."""
+        url = reverse(name, kwargs={
+            argument: ViewBudgetTests.kwargs[argument]
+            for argument in arguments
+        })
+        data = ViewBudgetTests.data.get(name, {})
+        getattr(client, method)(url, data)
+        timings = []
+        for _ in range(RUNS if CHECK_LATENCY else 1):
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                getattr(client, method)(url, data)
+                timings.append((time.perf_counter() - started) * 1000)
+        return len(queries.captured_queries), min(timings)
+
+    def test_views_stay_within_budget(self):
+        for name, arguments, method, user, max_queries, max_ms in BUDGETS:
+            client = Client()
+            if user == 'reader':
+                client.force_login(ViewBudgetTests.reader)
+            with self.subTest(view=name, method=method):
+                queries, elapsed = self.measure(
+                    name, arguments, method, client
+                )
+                self.assertLessEqual(queries, max_queries)
+                if CHECK_LATENCY:
+                    self.assertLessEqual(elapsed, max_ms)
@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Post
+
+User = get_user_model()
+
+
+class CommentsPaginationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='LionUser')
+        cls.post = Post.objects.create(
+            text='Some text about lions',
+            author=cls.author,
+        )
+        commenters = [
+            User.objects.create_user(username=f'LionUserFan{number}')
+            for number in range(3)
+        ]
+        Comment.objects.bulk_create(
+            Comment(
+                post=cls.post,
+                author=commenters[number % len(commenters)],
+                text=f'Roar {number}',
+            ) for number in range(settings.COMMENTS_AMOUNT * 2 + 5)
+        )
+        cls.ordered_ids = list(cls.post.comments.order_by(
+            '-created', '-pk'
+        ).values_list('pk', flat=True))
+        cls.url_post = reverse('post', kwargs={
+            'username': cls.author.username,
+            'post_id': cls.post.id,
+        })
+        cls.url_comments = reverse('post_comments', kwargs={
+            'username': cls.author.username,
+            'post_id': cls.post.id,
+        })
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_post_page_shows_first_batch(self):
+        response = self.guest_client.get(CommentsPaginationTests.url_post)
+        comments = response.context['comments']
+        self.assertEqual(
+            [comment.pk for comment in comments],
+            CommentsPaginationTests.ordered_ids[:settings.COMMENTS_AMOUNT]
+        )
+        self.assertContains(response, CommentsPaginationTests.url_comments)
+
+    def test_fragment_returns_following_batches(self):
+        response = self.guest_client.get(CommentsPaginationTests.url_post)
+        seen = [comment.pk for comment in response.context['comments']]
+        cursor = response.context['comments'].next_cursor
+        while cursor:
+            response = self.guest_client.get(
+                CommentsPaginationTests.url_comments, {'cursor': cursor}
+            )
+            self.assertTemplateUsed(
+                response, 'posts/include/comment_list.html'
+            )
+            self.assertNotContains(response, '<html')
+            seen.extend(comment.pk for comment in response.context['comments'])
+            cursor = response.context['comments'].next_cursor
+        self.assertEqual(seen, CommentsPaginationTests.ordered_ids)
+
+    def test_fragment_query_count_does_not_depend_on_authors(self):
+        with self.assertNumQueries(2):
+            self.guest_client.get(CommentsPaginationTests.url_comments)
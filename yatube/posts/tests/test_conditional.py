@@ -0,0 +1,176 @@
+import shutil
+import tempfile
+import time
+from http import HTTPStatus
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.http import http_date
+
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+GENERATIONS_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(
+    CACHES={
+        **settings.CACHES,
+        'generations': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': GENERATIONS_DIR,
+        },
+    },
+    GENERATIONS_CACHE='generations',
+)
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='LionUser')
+        cls.reader = User.objects.create_user(username='LionUserFan')
+        cls.group = Group.objects.create(
+            title='Lion', slug='lion', description='Lions fans are here'
+        )
+        cls.post = Post.objects.create(
+            text='Some text about lions', author=cls.author, group=cls.group
+        )
+        cls.url_post = reverse('post', kwargs={
+            'username': cls.author.username, 'post_id': cls.post.pk
+        })
+        cls.url_profile = reverse(
+            'profile', kwargs={'username': cls.author.username}
+        )
+        cls.urls = (
+            reverse('index'),
+            reverse('group_posts', kwargs={'slug': cls.group.slug}),
+            cls.url_profile,
+            cls.url_post,
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(GENERATIONS_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        caches['generations'].clear()
+        self.guest_client = Client()
+        self.reader_client = Client()
+        self.reader_client.force_login(ConditionalGetTests.reader)
+
+    def revalidate(self, client, url):
+        response = client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_unchanged_pages_are_not_modified(self):
+        for url in ConditionalGetTests.urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                with CaptureQueriesContext(connection) as queries:
+                    not_modified = self.guest_client.get(
+                        url, HTTP_IF_NONE_MATCH=response['ETag']
+                    )
+                self.assertEqual(
+                    not_modified.status_code, HTTPStatus.NOT_MODIFIED
+                )
+                self.assertEqual(not_modified.templates, [])
+                self.assertLessEqual(len(queries), 1)
+
+    def test_pages_have_no_last_modified(self):
+        for url in ConditionalGetTests.urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertNotIn('Last-Modified', response)
+                self.assertEqual(
+                    self.guest_client.get(
+                        url,
+                        HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60)
+                    ).status_code,
+                    HTTPStatus.OK
+                )
+
+    def test_new_post_modifies_feeds(self):
+        responses = [
+            self.guest_client.get(url) for url in ConditionalGetTests.urls
+        ]
+        Post.objects.create(
+            text='More lions', author=self.author, group=self.group
+        )
+        for url, response in zip(ConditionalGetTests.urls, responses):
+            with self.subTest(url=url):
+                self.assertEqual(
+                    self.guest_client.get(
+                        url, HTTP_IF_NONE_MATCH=response['ETag']
+                    ).status_code,
+                    HTTPStatus.OK
+                )
+
+    def test_comment_modifies_post_page(self):
+        response = self.guest_client.get(ConditionalGetTests.url_post)
+        Comment.objects.create(
+            post=ConditionalGetTests.post,
+            author=ConditionalGetTests.reader,
+            text='Roar',
+        )
+        response = self.guest_client.get(
+            ConditionalGetTests.url_post, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertContains(response, 'Roar')
+
+    def test_follow_modifies_profile_for_follower(self):
+        response = self.reader_client.get(ConditionalGetTests.url_profile)
+        Follow.objects.create(
+            user=ConditionalGetTests.reader, author=ConditionalGetTests.author
+        )
+        self.assertEqual(
+            self.reader_client.get(
+                ConditionalGetTests.url_profile,
+                HTTP_IF_NONE_MATCH=response['ETag']
+            ).status_code,
+            HTTPStatus.OK
+        )
+
+    def test_viewers_get_different_etags(self):
+        for url in ConditionalGetTests.urls:
+            with self.subTest(url=url):
+                self.assertNotEqual(
+                    self.guest_client.get(url)['ETag'],
+                    self.reader_client.get(url)['ETag']
+                )
+                self.assertIn('Cookie', self.guest_client.get(url)['Vary'])
+
+    def test_cursor_is_part_of_etag(self):
+        url = reverse('index')
+        self.assertNotEqual(
+            self.guest_client.get(url)['ETag'],
+            self.guest_client.get(url, {'page': 2})['ETag']
+        )
+
+    def test_missing_pages_are_not_found(self):
+        for url in (
+            reverse('profile', kwargs={'username': 'nobody'}),
+            reverse('group_posts', kwargs={'slug': 'nobody'}),
+            reverse('post', kwargs={'username': 'nobody', 'post_id': 1}),
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(
+                    self.guest_client.get(url).status_code,
+                    HTTPStatus.NOT_FOUND
+                )
+
+    @override_settings(GENERATIONS_CACHE='default')
+    def test_local_generations_send_no_validators(self):
+        for url in ConditionalGetTests.urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertNotIn('ETag', response)
+                self.assertNotIn('Last-Modified', response)
@@ -1,5 +1,10 @@
+import os
 import shutil
 import tempfile
+import threading
+from concurrent.futures import Future
+from http import HTTPStatus
+from unittest import mock
 
 from django import forms
 from django.conf import settings
@@ -9,11 +14,16 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
+from .. import uploads
 from ..models import Comment, Group, Post
 
 User = get_user_model()
 
 
+def crash(source, max_pixels):
+    os._exit(1)
+
+
 @override_settings(MEDIA_ROOT=tempfile.mkdtemp(dir=settings.BASE_DIR))
 class FormTests(TestCase):
     @classmethod
@@ -128,3 +138,100 @@ class FormTests(TestCase):
         self.assertEqual(new_comment.text, form_data['text'])
         self.assertEqual(new_comment.author, FormTests.author)
         self.assertEqual(new_comment.post.id, post.id)
+
+    def post_image(self, name, content, content_type='image/gif'):
+        return self.authorized_client.post(reverse('new_post'), {
+            'text': 'Testing image checks',
+            'image': SimpleUploadedFile(name, content, content_type),
+        })
+
+    @override_settings(POST_IMAGE_MAX_SIZE=1024 * 1024)
+    def test_oversized_image_is_rejected(self):
+        response = self.post_image(
+            'big.gif', FormTests.small_gif + b'\0' * 2 * 1024 * 1024
+        )
+        self.assertFormError(
+            response, 'form', 'image', 'Картинка больше 1 МБ'
+        )
+        self.assertFalse(Post.objects.exists())
+
+    def test_not_an_image_is_rejected(self):
+        response = self.post_image('lion.gif', b'<?php echo "roar"; ?>')
+        self.assertFormError(
+            response, 'form', 'image',
+            'Загрузите картинку в формате JPEG, PNG, GIF или WebP'
+        )
+
+    @override_settings(POST_IMAGE_MAX_PIXELS=1)
+    def test_image_with_too_many_pixels_is_rejected(self):
+        response = self.post_image('small.gif', FormTests.small_gif)
+        self.assertFormError(
+            response, 'form', 'image',
+            'Картинка слишком большая по количеству пикселей'
+        )
+
+    def test_broken_image_does_not_decode(self):
+        self.assertTrue(
+            uploads.decodes_safely(
+                SimpleUploadedFile('small.gif', FormTests.small_gif)
+            )
+        )
+        self.assertFalse(
+            uploads.decodes_safely(
+                SimpleUploadedFile('broken.gif', FormTests.small_gif[:20])
+            )
+        )
+
+    def test_slot_is_held_until_decode_finishes(self):
+        future = Future()
+        future.set_running_or_notify_cancel()
+        executor = mock.Mock(submit=mock.Mock(return_value=future))
+        slots = threading.BoundedSemaphore(1)
+        with mock.patch.object(
+            uploads, 'get_executor', return_value=(executor, slots)
+        ), override_settings(UPLOAD_CHECK_TIMEOUT=0.01):
+            self.assertFalse(uploads.decodes_safely(
+                SimpleUploadedFile('small.gif', FormTests.small_gif)
+            ))
+        self.assertFalse(slots.acquire(blocking=False))
+        future.set_result(True)
+        self.assertTrue(slots.acquire(blocking=False))
+
+    def test_dead_decoder_rejects_upload_and_pool_recovers(self):
+        with mock.patch.object(uploads, 'decode', crash):
+            self.assertFalse(uploads.decodes_safely(
+                SimpleUploadedFile('small.gif', FormTests.small_gif)
+            ))
+        self.assertTrue(uploads.decodes_safely(
+            SimpleUploadedFile('small.gif', FormTests.small_gif)
+        ))
+
+    def test_post_views_stream_uploads_through_image_handler(self):
+        with mock.patch.object(uploads.metrics, 'observe') as observe:
+            self.post_image('small.gif', FormTests.small_gif)
+        observe.assert_any_call(
+            'yatube_upload_size_bytes', len(FormTests.small_gif)
+        )
+
+    def test_post_views_still_check_csrf_token(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(FormTests.author)
+        response = client.post(reverse('new_post'), {
+            'text': 'Testing image checks',
+            'image': SimpleUploadedFile('small.gif', FormTests.small_gif),
+        })
+        self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(POST_IMAGE_MAX_SIZE=10)
+    def test_upload_handler_stops_writing_past_limit(self):
+        handler = uploads.ImageUploadHandler()
+        handler.new_file('image', 'big.gif', 'image/gif', None)
+        for start in range(0, 40, 8):
+            handler.receive_data_chunk(
+                FormTests.small_gif[start:start + 8], start
+            )
+        upload = handler.file_complete(40)
+        self.assertTrue(upload.oversized)
+        self.assertEqual(upload.image_format, 'GIF')
+        self.assertLessEqual(len(upload.read()), 10)
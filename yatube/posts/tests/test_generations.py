@@ -0,0 +1,93 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.test import TestCase, override_settings
+
+from .. import generations, timeline
+from ..models import Comment, Follow, Post
+
+User = get_user_model()
+
+FILE_CACHE_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+class GenerationsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='LionUser')
+        cls.reader = User.objects.create_user(username='LionUserFan')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(FILE_CACHE_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+
+    def follow_version(self):
+        return generations.follow_version(
+            GenerationsTests.reader,
+            timeline.celebrity_ids(GenerationsTests.reader),
+        )
+
+    def test_fan_out_bumps_followers(self):
+        version = self.follow_version()
+        Post.objects.create(text='Fresh', author=GenerationsTests.author)
+        self.assertNotEqual(self.follow_version(), version)
+
+    def test_comment_does_not_bump_followers(self):
+        post = Post.objects.create(
+            text='Fresh', author=GenerationsTests.author
+        )
+        version = self.follow_version()
+        Comment.objects.create(
+            post=post, author=GenerationsTests.reader, text='Roar'
+        )
+        self.assertEqual(self.follow_version(), version)
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_celebrity_post_bumps_its_profile_only(self):
+        follow_key = (
+            generations.KEY_PREFIX
+            + generations.follow_scope(GenerationsTests.reader.pk)
+        )
+        version = self.follow_version()
+        generation = cache.get(follow_key)
+        Post.objects.create(text='Fresh', author=GenerationsTests.author)
+        self.assertEqual(cache.get(follow_key), generation)
+        self.assertNotEqual(self.follow_version(), version)
+
+    def test_local_memory_generations_expire(self):
+        self.assertFalse(generations.is_shared())
+        self.assertEqual(
+            generations.get_timeout(), settings.GENERATION_LOCAL_TIMEOUT
+        )
+
+    @override_settings(
+        CACHES={
+            **settings.CACHES,
+            'generations': {
+                'BACKEND': (
+                    'django.core.cache.backends.filebased.FileBasedCache'
+                ),
+                'LOCATION': FILE_CACHE_DIR,
+            },
+        },
+        GENERATIONS_CACHE='generations',
+    )
+    def test_shared_generations_do_not_expire(self):
+        self.assertTrue(generations.is_shared())
+        self.assertIsNone(generations.get_timeout())
+        version = generations.get_version(generations.index_scope())
+        self.assertEqual(
+            caches['generations'].get(
+                generations.KEY_PREFIX + generations.index_scope()
+            ),
+            int(version)
+        )
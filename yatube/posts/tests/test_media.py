@@ -0,0 +1,109 @@
+import os
+import shutil
+import tempfile
+from http import HTTPStatus
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+
+from ..media import IMMUTABLE
+from ..models import Post
+
+User = get_user_model()
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(dir=settings.BASE_DIR))
+class MediaTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='LionUser')
+        cls.post = Post.objects.create(
+            text='Some text about lions',
+            author=cls.author,
+            image=SimpleUploadedFile('small.gif', SMALL_GIF, 'image/gif'),
+        )
+        cls.url = cls.post.image.url
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_post_image_is_served(self):
+        response = self.guest_client.get(MediaTests.url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(b''.join(response.streaming_content), SMALL_GIF)
+        self.assertEqual(response['Content-Type'], 'image/gif')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Cache-Control'], IMMUTABLE)
+
+    def test_ranges(self):
+        size = len(SMALL_GIF)
+        for header, status, content_range, content in (
+            ('bytes=0-9', HTTPStatus.PARTIAL_CONTENT,
+             f'bytes 0-9/{size}', SMALL_GIF[:10]),
+            ('bytes=30-', HTTPStatus.PARTIAL_CONTENT,
+             f'bytes 30-{size - 1}/{size}', SMALL_GIF[30:]),
+            ('bytes=-5', HTTPStatus.PARTIAL_CONTENT,
+             f'bytes {size - 5}-{size - 1}/{size}', SMALL_GIF[-5:]),
+            ('bytes=100-', HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE,
+             f'bytes */{size}', None),
+        ):
+            with self.subTest(header=header):
+                response = self.guest_client.get(
+                    MediaTests.url, HTTP_RANGE=header
+                )
+                self.assertEqual(response.status_code, status)
+                self.assertEqual(response['Content-Range'], content_range)
+                if content is not None:
+                    self.assertEqual(
+                        int(response['Content-Length']), len(content)
+                    )
+                    self.assertEqual(
+                        b''.join(response.streaming_content), content
+                    )
+
+    def test_unreferenced_and_outside_files_are_not_found(self):
+        orphan = os.path.join(settings.MEDIA_ROOT, 'posts', 'orphan.gif')
+        with open(orphan, 'wb') as file:
+            file.write(SMALL_GIF)
+        for url in (
+            settings.MEDIA_URL + 'posts/orphan.gif',
+            settings.MEDIA_URL + 'posts/missing.gif',
+            settings.MEDIA_URL + '../yatube/settings.py',
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(
+                    self.guest_client.get(url).status_code,
+                    HTTPStatus.NOT_FOUND
+                )
+
+    @override_settings(MEDIA_SENDFILE='x-accel-redirect')
+    def test_x_accel_redirect(self):
+        response = self.guest_client.get(MediaTests.url)
+        self.assertEqual(
+            response['X-Accel-Redirect'],
+            settings.MEDIA_ACCEL_PREFIX + MediaTests.post.image.name
+        )
+        self.assertEqual(response.content, b'')
+
+    @override_settings(MEDIA_SENDFILE='x-sendfile')
+    def test_x_sendfile(self):
+        response = self.guest_client.get(MediaTests.url)
+        self.assertEqual(response['X-Sendfile'], MediaTests.post.image.path)
+        self.assertEqual(response['Content-Type'], 'image/gif')
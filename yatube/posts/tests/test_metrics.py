@@ -0,0 +1,155 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.kvstores.cached_db_kvstore import EMPTY_VALUE
+
+from yatube import metrics
+
+from ..models import Post
+
+User = get_user_model()
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(
+    MEDIA_ROOT=tempfile.mkdtemp(dir=settings.BASE_DIR), THUMBNAIL_WORKERS=0,
+    METRICS_TOKEN='lion-token'
+)
+class MetricsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='LionUser')
+        Post.objects.create(text='Roar', author=cls.author)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        metrics.registry.reset()
+        self.client = Client()
+
+    def scrape(self):
+        response = self.client.get(
+            reverse('metrics'), HTTP_AUTHORIZATION='Bearer lion-token'
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def value(self, text, sample):
+        match = re.search(rf'^{re.escape(sample)} (\S+)$', text, re.M)
+        return float(match.group(1)) if match else None
+
+    def test_requests_are_counted_per_view(self):
+        for _ in range(2):
+            self.client.get(reverse('index'))
+        text = self.scrape()
+        self.assertEqual(self.value(
+            text, 'yatube_requests_total{view="index",status="200"}'
+        ), 2)
+        self.assertEqual(self.value(
+            text, 'yatube_request_duration_seconds_count{view="index"}'
+        ), 2)
+        self.assertEqual(self.value(
+            text,
+            'yatube_request_duration_seconds_bucket{view="index",le="+Inf"}'
+        ), 2)
+        self.assertGreater(self.value(
+            text, 'yatube_request_queries_sum{view="index"}'
+        ), 0)
+
+    def test_cache_hits_and_misses_per_family(self):
+        for _ in range(2):
+            self.client.get(reverse('index'))
+        text = self.scrape()
+        self.assertEqual(self.value(
+            text, 'yatube_cache_misses_total{family="index_page"}'
+        ), 1)
+        self.assertEqual(self.value(
+            text, 'yatube_cache_hits_total{family="index_page"}'
+        ), 1)
+
+    def test_upload_sizes(self):
+        author_client = Client()
+        author_client.force_login(MetricsTests.author)
+        author_client.post(reverse('new_post'), {
+            'text': 'Lions are here',
+            'image': SimpleUploadedFile('new.gif', SMALL_GIF, 'image/gif'),
+        })
+        self.assertEqual(self.value(
+            self.scrape(), 'yatube_upload_size_bytes_count'
+        ), 1)
+
+    def test_workers_are_added_up(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with open(os.path.join(directory, 'other-worker.json'), 'w') as file:
+            json.dump({
+                'counters': [[
+                    'yatube_requests_total',
+                    [['view', 'index'], ['status', '200']], 5
+                ]],
+                'histograms': [],
+            }, file)
+        with override_settings(METRICS_DIR=directory):
+            self.client.get(reverse('index'))
+            text = self.scrape()
+        self.assertEqual(self.value(
+            text, 'yatube_requests_total{view="index",status="200"}'
+        ), 6)
+
+    def test_forked_worker_starts_empty(self):
+        metrics.inc('yatube_requests_total', (('view', 'index'),))
+        metrics.registry.pid = -1
+        self.assertEqual(metrics.registry.dump()['counters'], [])
+
+    def test_hidden_without_token(self):
+        for headers in (
+            {}, {'HTTP_AUTHORIZATION': 'Bearer wrong'},
+            {'REMOTE_ADDR': '127.0.0.1'},
+        ):
+            with self.subTest(headers=headers):
+                response = self.client.get(reverse('metrics'), **headers)
+                self.assertEqual(response.status_code, 404)
+
+    @override_settings(METRICS_TOKEN=None)
+    def test_off_without_configured_token(self):
+        response = self.client.get(
+            reverse('metrics'), HTTP_AUTHORIZATION='Bearer None'
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_empty_thumbnail_entries_are_misses(self):
+        prefix = thumbnail_settings.THUMBNAIL_KEY_PREFIX
+        cache.set(f'{prefix}-missing', EMPTY_VALUE)
+        cache.set(f'{prefix}-found', '{"name": "cache/found.jpg"}')
+        cache.get(f'{prefix}-missing')
+        cache.get_many([f'{prefix}-missing', f'{prefix}-found'])
+        text = self.scrape()
+        self.assertEqual(self.value(
+            text, 'yatube_cache_misses_total{family="thumbnails"}'
+        ), 2)
+        self.assertEqual(self.value(
+            text, 'yatube_cache_hits_total{family="thumbnails"}'
+        ), 1)
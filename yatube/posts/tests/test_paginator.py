@@ -0,0 +1,129 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Group, Post
+from ..paginator import CursorPaginator
+
+User = get_user_model()
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='LionUser')
+        cls.group = Group.objects.create(
+            title='Lion',
+            slug='lion',
+            description='Lions fans are here',
+        )
+        Post.objects.bulk_create(
+            Post(
+                text=f'Post number {number}',
+                author=cls.author,
+                group=cls.group,
+            ) for number in range(settings.PAGES_AMOUNT * 2 + 3)
+        )
+        cls.ordered_ids = list(
+            Post.objects.order_by('-pub_date', '-pk').values_list(
+                'pk', flat=True
+            )
+        )
+        cls.feed_urls = (
+            reverse('index'),
+            reverse('group_posts', kwargs={'slug': cls.group.slug}),
+            reverse('profile', kwargs={'username': cls.author.username}),
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+        cache.clear()
+
+    def get_paginator(self):
+        return CursorPaginator(Post.objects.all(), settings.PAGES_AMOUNT)
+
+    def test_pages_follow_each_other(self):
+        paginator = self.get_paginator()
+        page = paginator.get_cursor_page(None)
+        seen = [post.pk for post in page]
+        self.assertEqual(page.previous_cursor, '')
+        while page.next_cursor:
+            page = paginator.get_cursor_page(page.next_cursor)
+            seen.extend(post.pk for post in page)
+        self.assertEqual(seen, CursorPaginatorTests.ordered_ids)
+
+    def test_previous_cursor_returns_previous_page(self):
+        paginator = self.get_paginator()
+        first = paginator.get_cursor_page(None)
+        second = paginator.get_cursor_page(first.next_cursor)
+        back = paginator.get_cursor_page(second.previous_cursor)
+        self.assertEqual(list(back), list(first))
+        self.assertEqual(back.previous_cursor, '')
+        self.assertEqual(back.next_cursor, first.next_cursor)
+
+    def test_cursor_pages_are_numbered(self):
+        paginator = self.get_paginator()
+        first = paginator.get_cursor_page(None)
+        second = paginator.get_cursor_page(first.next_cursor)
+        third = paginator.get_cursor_page(second.next_cursor)
+        back = paginator.get_cursor_page(third.previous_cursor)
+        self.assertEqual(
+            [page.number for page in (first, second, third, back)],
+            [1, 2, 3, 2]
+        )
+        self.assertEqual(third.start_index(), settings.PAGES_AMOUNT * 2 + 1)
+
+    def test_tampered_cursor_falls_back_to_first_page(self):
+        paginator = self.get_paginator()
+        first = paginator.get_cursor_page(None)
+        cursor = first.next_cursor
+        tampered = cursor[:-1] + ('A' if cursor[-1] != 'A' else 'B')
+        page = paginator.get_cursor_page(tampered)
+        self.assertEqual(list(page), list(first))
+
+    def test_deep_page_is_single_range_read(self):
+        paginator = self.get_paginator()
+        first = paginator.get_cursor_page(None)
+        second = paginator.get_cursor_page(first.next_cursor)
+        with CaptureQueriesContext(connection) as queries:
+            page = paginator.get_cursor_page(second.next_cursor)
+        self.assertEqual(len(queries.captured_queries), 1)
+        sql = queries.captured_queries[0]['sql']
+        self.assertNotIn('COUNT(', sql)
+        self.assertNotIn('OFFSET', sql)
+        self.assertEqual(
+            [post.pk for post in page],
+            CursorPaginatorTests.ordered_ids[settings.PAGES_AMOUNT * 2:]
+        )
+
+    def test_feeds_accept_cursor(self):
+        for url in CursorPaginatorTests.feed_urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                cursor = response.context['page'].next_cursor
+                response = self.guest_client.get(url, {'cursor': cursor})
+                self.assertEqual(
+                    [post.pk for post in response.context['page']],
+                    CursorPaginatorTests.ordered_ids[
+                        settings.PAGES_AMOUNT:settings.PAGES_AMOUNT * 2
+                    ]
+                )
+                self.assertContains(response, '?cursor=')
+
+    def test_legacy_page_links_still_work(self):
+        for url in CursorPaginatorTests.feed_urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url, {'page': 3})
+                page = response.context['page']
+                self.assertEqual(page.number, 3)
+                self.assertEqual(
+                    [post.pk for post in page],
+                    CursorPaginatorTests.ordered_ids[
+                        settings.PAGES_AMOUNT * 2:
+                    ]
+                )
@@ -0,0 +1,95 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from yatube import metrics
+
+from ..models import Post
+
+User = get_user_model()
+
+
+class PostCardsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='LionUser')
+        cls.reader = User.objects.create_user(username='LionUserFan')
+        cls.posts = [
+            Post.objects.create(
+                text=f'Some text about lions {number}',
+                author=cls.author,
+            ) for number in range(3)
+        ]
+        cls.template = Template(
+            '{% load post_cards %}{% edit_buttons posts %}'
+            '{% post_cards posts %}{% endedit_buttons %}'
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def render(self, user):
+        return PostCardsTests.template.render(Context({
+            'posts': Post.objects.feed().order_by('pk'),
+            'user': user,
+        }))
+
+    def test_cards_are_fetched_with_one_get_many(self):
+        self.render(AnonymousUser())
+        with mock.patch.object(
+            cache, 'get_many', wraps=cache.get_many
+        ) as get_many, mock.patch.object(
+            cache, 'set_many', wraps=cache.set_many
+        ) as set_many:
+            self.render(AnonymousUser())
+        get_many.assert_called_once()
+        set_many.assert_not_called()
+
+    def test_cached_card_is_served_until_revision_changes(self):
+        post = PostCardsTests.posts[0]
+        self.render(AnonymousUser())
+        Post.objects.filter(pk=post.pk).update(text='Silently changed')
+        self.assertNotIn('Silently changed', self.render(AnonymousUser()))
+        post = Post.objects.get(pk=post.pk)
+        post.text = 'Edited text'
+        post.save()
+        self.assertIn('Edited text', self.render(AnonymousUser()))
+
+    def test_edit_button_is_rendered_per_viewer(self):
+        self.render(PostCardsTests.reader)
+        self.assertEqual(
+            self.render(PostCardsTests.author).count('Редактировать'),
+            len(PostCardsTests.posts)
+        )
+        self.assertNotIn('Редактировать', self.render(PostCardsTests.reader))
+
+    def test_feed_fragment_is_shared_by_viewers(self):
+        reader_client, author_client = Client(), Client()
+        reader_client.force_login(PostCardsTests.reader)
+        author_client.force_login(PostCardsTests.author)
+        url = reverse('index')
+        self.assertNotContains(reader_client.get(url), 'Редактировать')
+        metrics.registry.reset()
+        response = author_client.get(url)
+        self.assertEqual(metrics.registry.counters.get(
+            ('yatube_cache_hits_total', (('family', 'index_page'),))
+        ), 1)
+        self.assertContains(
+            response, 'Редактировать', count=len(PostCardsTests.posts)
+        )
+
+    def test_post_page_keeps_edit_button(self):
+        author_client = Client()
+        author_client.force_login(PostCardsTests.author)
+        post = PostCardsTests.posts[0]
+        response = author_client.get(reverse('post', kwargs={
+            'username': PostCardsTests.author.username,
+            'post_id': post.id,
+        }))
+        self.assertContains(response, 'Редактировать')
@@ -0,0 +1,63 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class FeedQueriesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Lion',
+            slug='lion',
+            description='Lions fans are here',
+        )
+        cls.author = User.objects.create_user(username='LionUser')
+        cls.follower = User.objects.create_user(username='LionUserFan')
+        Follow.objects.create(user=cls.follower, author=cls.author)
+        for number in range(25):
+            post = Post.objects.create(
+                text=f'Some text about lions {number}',
+                author=cls.author,
+                group=cls.group,
+            )
+            Comment.objects.create(
+                post=post,
+                author=cls.follower,
+                text='Roar',
+            )
+        cls.urls = (
+            reverse('index'),
+            reverse('group_posts', kwargs={'slug': cls.group.slug}),
+            reverse('profile', kwargs={'username': cls.author.username}),
+            reverse('post', kwargs={
+                'username': cls.author.username,
+                'post_id': post.id,
+            }),
+            reverse('follow_index'),
+        )
+
+    def setUp(self):
+        self.follower_client = Client()
+        self.follower_client.force_login(FeedQueriesTests.follower)
+
+    def count_queries(self, url, pages_amount):
+        cache.clear()
+        with override_settings(PAGES_AMOUNT=pages_amount):
+            with CaptureQueriesContext(connection) as queries:
+                self.follower_client.get(url)
+        return len(queries.captured_queries)
+
+    def test_feed_queries_do_not_grow_with_page_size(self):
+        for url in FeedQueriesTests.urls:
+            with self.subTest(url=url):
+                small_page = self.count_queries(url, 2)
+                large_page = self.count_queries(url, 20)
+                self.assertEqual(small_page, large_page)
@@ -0,0 +1,25 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from ..models import Post
+
+
+class AuditQueryPlansTests(TestCase):
+    def test_baseline_is_up_to_date(self):
+        call_command('audit_query_plans', ci=True, stdout=StringIO())
+        self.assertFalse(Post.objects.exists())
+
+    def test_regression_fails_ci(self):
+        baseline = os.path.join(tempfile.mkdtemp(), 'query_plans.json')
+        with open(baseline, 'w') as file:
+            json.dump([], file)
+        with self.assertRaisesMessage(CommandError, 'group_posts'):
+            call_command(
+                'audit_query_plans', ci=True, baseline=baseline,
+                stdout=StringIO()
+            )
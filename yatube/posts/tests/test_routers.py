@@ -0,0 +1,142 @@
+import os
+import sqlite3
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError
+from django.http import HttpResponse
+from django.test import (
+    Client, RequestFactory, TestCase, TransactionTestCase, override_settings
+)
+from django.urls import reverse
+
+from yatube import routers
+
+from .. import generations
+from ..models import Post
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRouterTests(TestCase):
+    def setUp(self):
+        routers._down_until.clear()
+        self.router = routers.ReplicaRouter()
+        self.replica = mock.Mock()
+        connections = mock.patch.object(
+            routers, 'connections', {'replica': self.replica}
+        )
+        connections.start()
+        self.addCleanup(connections.stop)
+
+    def route(self, request):
+        """Return where the request's reads went and its response."""
+        databases = []
+
+        def view(request):
+            databases.append(self.router.db_for_read(Post))
+            return HttpResponse()
+
+        response = routers.ReplicaRoutingMiddleware(view)(request)
+        return databases[0], response
+
+    def test_safe_requests_read_from_replica(self):
+        database, response = self.route(RequestFactory().get('/'))
+        self.assertEqual(database, 'replica')
+        self.assertNotIn(routers.STICKY_COOKIE, response.cookies)
+        database, _ = self.route(RequestFactory().post('/'))
+        self.assertEqual(database, 'default')
+
+    def test_sessions_and_users_are_read_from_primary(self):
+        def view(request):
+            return HttpResponse(' '.join(
+                self.router.db_for_read(model)
+                for model in (Session, User, ContentType)
+            ))
+
+        response = routers.ReplicaRoutingMiddleware(view)(
+            RequestFactory().get('/')
+        )
+        self.assertEqual(response.content, b'default default default')
+
+    def test_fresh_generation_is_filled_from_primary(self):
+        scope = generations.index_scope()
+
+        def view(request):
+            generations.get_version(scope)
+            return HttpResponse(self.router.db_for_read(Post))
+
+        cache.clear()
+        generations.bump(scope)
+        response = routers.ReplicaRoutingMiddleware(view)(
+            RequestFactory().get('/')
+        )
+        self.assertEqual(response.content, b'default')
+        cache.set(
+            generations.KEY_PREFIX + scope,
+            generations.new_generation() - 60 * 10 ** 9
+        )
+        response = routers.ReplicaRoutingMiddleware(view)(
+            RequestFactory().get('/')
+        )
+        self.assertEqual(response.content, b'replica')
+
+    def test_reads_outside_requests_use_primary(self):
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    def test_reads_after_write_use_primary(self):
+        def view(request):
+            self.router.db_for_write(Post)
+            return HttpResponse(self.router.db_for_read(Post))
+
+        response = routers.ReplicaRoutingMiddleware(view)(
+            RequestFactory().get('/')
+        )
+        self.assertEqual(response.content, b'default')
+        self.assertIn(routers.STICKY_COOKIE, response.cookies)
+
+    def test_writer_sticks_to_primary(self):
+        request = RequestFactory().get('/')
+        request.COOKIES[routers.STICKY_COOKIE] = '1'
+        database, _ = self.route(request)
+        self.assertEqual(database, 'default')
+
+    def test_failover_to_primary(self):
+        self.replica.ensure_connection.side_effect = OperationalError
+        for _ in range(2):
+            database, _ = self.route(RequestFactory().get('/'))
+            self.assertEqual(database, 'default')
+        self.replica.ensure_connection.assert_called_once()
+
+    def test_follow_makes_client_sticky(self):
+        self.replica.ensure_connection.side_effect = OperationalError
+        author = User.objects.create_user(username='LionUser')
+        client = Client()
+        client.force_login(User.objects.create_user(username='LionUserFan'))
+        response = client.get(reverse(
+            'profile_follow', kwargs={'username': author.username}
+        ))
+        self.assertIn(routers.STICKY_COOKIE, response.cookies)
+
+
+class CopySqliteReplicasTests(TransactionTestCase):
+    def test_replica_has_the_data(self):
+        Post.objects.create(
+            text='Roar', author=User.objects.create_user(username='LionUser')
+        )
+        path = os.path.join(tempfile.mkdtemp(), 'replica.sqlite3')
+        with override_settings(SQLITE_REPLICAS=[path]):
+            call_command('copy_sqlite_replicas', stdout=StringIO())
+        replica = sqlite3.connect(path)
+        try:
+            posts = replica.execute('SELECT text FROM posts_post').fetchall()
+        finally:
+            replica.close()
+        self.assertEqual(posts, [('Roar',)])
@@ -0,0 +1,119 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.db.backends.utils import CursorWrapper
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Post
+from ..search import SEARCH_TABLE
+
+User = get_user_model()
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='LionUser')
+        cls.lion = Post.objects.create(
+            text='The lion sleeps tonight',
+            author=cls.author,
+        )
+        cls.lions = Post.objects.create(
+            text='Lion after lion after lion',
+            author=cls.author,
+        )
+        cls.tiger = Post.objects.create(
+            text='A <b>tiger</b> in the jungle',
+            author=cls.author,
+        )
+        cls.url_search = reverse('search')
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def search(self, query, **params):
+        response = self.guest_client.get(
+            SearchTests.url_search, {'q': query, **params}
+        )
+        return response, [post.pk for post in response.context['page']]
+
+    def test_results_are_ranked(self):
+        _, found = self.search('lion')
+        self.assertEqual(found, [SearchTests.lions.pk, SearchTests.lion.pk])
+
+    def test_snippets_are_highlighted_and_escaped(self):
+        response, _ = self.search('tiger')
+        self.assertContains(response, '&lt;b&gt;<mark>tiger</mark>&lt;/b&gt;')
+
+    def test_index_follows_updates_and_deletes(self):
+        post = Post.objects.create(text='Zebra stripes', author=self.author)
+        self.assertEqual(self.search('zebra')[1], [post.pk])
+        Post.objects.filter(pk=post.pk).update(text='Giraffe neck')
+        self.assertEqual(self.search('zebra')[1], [])
+        self.assertEqual(self.search('giraffe')[1], [post.pk])
+        post.delete()
+        self.assertEqual(self.search('giraffe')[1], [])
+
+    def test_query_syntax_is_not_interpreted(self):
+        response, found = self.search('lion" OR tiger*')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(found, [])
+
+    @override_settings(PAGES_AMOUNT=1)
+    def test_results_are_cursor_paginated(self):
+        response, found = self.search('lion')
+        cursor = response.context['page'].next_cursor
+        response, next_found = self.search('lion', cursor=cursor)
+        self.assertEqual(
+            found + next_found, [SearchTests.lions.pk, SearchTests.lion.pk]
+        )
+        self.assertEqual(response.context['page'].next_cursor, '')
+
+    def test_admin_search_uses_index(self):
+        admin = User.objects.create_superuser(username='Admin')
+        admin_client = Client()
+        admin_client.force_login(admin)
+        response = admin_client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'lion'}
+        )
+        self.assertEqual(
+            {post.pk for post in response.context['cl'].result_list},
+            {SearchTests.lion.pk, SearchTests.lions.pk}
+        )
+
+    def test_rebuild_search_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) "
+                f"VALUES ('delete-all')"
+            )
+        self.assertEqual(self.search('lion')[1], [])
+        call_command('rebuild_search_index', batch_size=1, stdout=StringIO())
+        self.assertEqual(
+            self.search('lion')[1], [SearchTests.lions.pk, SearchTests.lion.pk]
+        )
+
+    def test_failed_rebuild_keeps_old_index(self):
+        executemany = CursorWrapper.executemany
+        calls = []
+
+        def fail_second_batch(cursor, sql, param_list):
+            calls.append(sql)
+            if len(calls) > 1:
+                raise DatabaseError('disk full')
+            return executemany(cursor, sql, param_list)
+
+        with mock.patch.object(
+            CursorWrapper, 'executemany', fail_second_batch
+        ), self.assertRaises(DatabaseError):
+            call_command(
+                'rebuild_search_index', batch_size=1, stdout=StringIO()
+            )
+        self.assertEqual(
+            self.search('lion')[1], [SearchTests.lions.pk, SearchTests.lion.pk]
+        )
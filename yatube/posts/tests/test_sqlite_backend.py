@@ -0,0 +1,59 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from yatube.backends.sqlite3.base import DatabaseWrapper
+
+
+class SqliteBackendTests(TestCase):
+    def test_pragmas_are_applied(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 5000)
+
+
+class HealthCheckTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'db.sqlite3')
+        sqlite3.connect(self.path).close()
+        self.database = DatabaseWrapper({
+            **connection.settings_dict, 'NAME': self.path,
+            'CONN_MAX_AGE': 600,
+        })
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.addCleanup(self.database.close)
+
+    def next_request(self):
+        self.database.close_if_unusable_or_obsolete()
+        self.database.ensure_connection()
+
+    def test_healthy_connection_is_kept(self):
+        self.database.ensure_connection()
+        kept = self.database.connection
+        self.next_request()
+        self.assertIs(self.database.connection, kept)
+
+    def test_swapped_file_reconnects(self):
+        self.database.ensure_connection()
+        stale = self.database.connection
+        copy = os.path.join(self.directory, 'copy.sqlite3')
+        sqlite3.connect(copy).close()
+        os.replace(copy, self.path)
+        self.next_request()
+        self.assertIsNot(self.database.connection, stale)
+
+
+class BenchmarkSqliteTests(SimpleTestCase):
+    def test_reports_both_profiles(self):
+        out = StringIO()
+        call_command(
+            'benchmark_sqlite', readers=1, writers=1, seconds=0.2, stdout=out
+        )
+        self.assertEqual(out.getvalue().count('записей'), 2)
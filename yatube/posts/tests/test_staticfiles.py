@@ -0,0 +1,90 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from yatube.staticfiles import IMMUTABLE, REVALIDATE, StaticFilesMiddleware
+
+STYLES = 'body { background: url("lion.svg"); }\n' + (
+    '.lion { color: #c90; }\n' * 40
+)
+
+
+class StaticFilesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.source = tempfile.mkdtemp()
+        cls.root = tempfile.mkdtemp()
+        with open(os.path.join(cls.source, 'lion.css'), 'w') as file:
+            file.write(STYLES)
+        with open(os.path.join(cls.source, 'lion.svg'), 'w') as file:
+            file.write('<svg xmlns="http://www.w3.org/2000/svg"/>')
+        cls.settings = override_settings(
+            STATICFILES_DIRS=[cls.source],
+            STATIC_ROOT=cls.root,
+            INSTALLED_APPS=['django.contrib.staticfiles'],
+        )
+        cls.settings.enable()
+        call_command('collectstatic', interactive=False, verbosity=0)
+        with open(os.path.join(cls.root, 'staticfiles.json')) as manifest:
+            cls.paths = json.load(manifest)['paths']
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings.disable()
+        shutil.rmtree(cls.source, ignore_errors=True)
+        shutil.rmtree(cls.root, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.middleware = StaticFilesMiddleware(lambda request: HttpResponse())
+        self.factory = RequestFactory()
+
+    def get(self, name, **headers):
+        return self.middleware(
+            self.factory.get(settings.STATIC_URL + name, **headers)
+        )
+
+    def test_collectstatic_writes_hashed_and_compressed_files(self):
+        hashed = StaticFilesTests.paths['lion.css']
+        self.assertRegex(hashed, r'^lion\.\w{12}\.css$')
+        self.assertIn(hashed, staticfiles_storage.url('lion.css'))
+        compressed = os.path.join(StaticFilesTests.root, hashed + '.gz')
+        with gzip.open(compressed) as file:
+            self.assertIn(
+                StaticFilesTests.paths['lion.svg'], file.read().decode()
+            )
+
+    def test_hashed_files_are_immutable_and_precompressed(self):
+        hashed = StaticFilesTests.paths['lion.css']
+        response = self.get(hashed, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Cache-Control'], IMMUTABLE)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        body = gzip.decompress(b''.join(response.streaming_content))
+        self.assertIn(b'.lion', body)
+
+    def test_plain_response_without_accept_encoding(self):
+        response = self.get(
+            StaticFilesTests.paths['lion.css'],
+            HTTP_ACCEPT_ENCODING='gzip;q=0'
+        )
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertIn(b'.lion', b''.join(response.streaming_content))
+
+    def test_original_names_revalidate(self):
+        response = self.get('lion.css')
+        self.assertEqual(response['Cache-Control'], REVALIDATE)
+
+    def test_unknown_files_pass_through(self):
+        response = self.get('tiger.css')
+        self.assertFalse(response.has_header('Cache-Control'))
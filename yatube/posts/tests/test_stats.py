@@ -0,0 +1,85 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Follow, Post, UserStats
+from ..stats import authors_with_stats
+
+User = get_user_model()
+
+
+class UserStatsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='LionUser')
+        cls.follower = User.objects.create_user(username='LionUserFan')
+
+    def setUp(self):
+        self.follower_client = Client()
+        self.follower_client.force_login(UserStatsTests.follower)
+
+    def get_stats(self, user):
+        return UserStats.objects.get(user=user)
+
+    def test_posts_are_counted(self):
+        post = Post.objects.create(text='Roar', author=UserStatsTests.author)
+        Post.objects.create(text='Roar again', author=UserStatsTests.author)
+        self.assertEqual(self.get_stats(UserStatsTests.author).posts_count, 2)
+        post.delete()
+        self.assertEqual(self.get_stats(UserStatsTests.author).posts_count, 1)
+
+    def test_follows_are_counted(self):
+        follow = Follow.objects.create(
+            user=UserStatsTests.follower, author=UserStatsTests.author
+        )
+        self.assertEqual(
+            self.get_stats(UserStatsTests.author).followers_count, 1
+        )
+        self.assertEqual(
+            self.get_stats(UserStatsTests.follower).following_count, 1
+        )
+        follow.delete()
+        self.assertEqual(
+            self.get_stats(UserStatsTests.author).followers_count, 0
+        )
+        self.assertEqual(
+            self.get_stats(UserStatsTests.follower).following_count, 0
+        )
+
+    def test_recount_stats_repairs_drift(self):
+        Post.objects.create(text='Roar', author=UserStatsTests.author)
+        Follow.objects.create(
+            user=UserStatsTests.follower, author=UserStatsTests.author
+        )
+        UserStats.objects.update(
+            posts_count=42, followers_count=42, following_count=42
+        )
+        UserStats.objects.filter(user=UserStatsTests.follower).delete()
+        call_command('recount_stats', chunk_size=1, stdout=StringIO())
+        author_stats = self.get_stats(UserStatsTests.author)
+        self.assertEqual(author_stats.posts_count, 1)
+        self.assertEqual(author_stats.followers_count, 1)
+        self.assertEqual(author_stats.following_count, 0)
+        self.assertEqual(
+            self.get_stats(UserStatsTests.follower).following_count, 1
+        )
+
+    def test_author_card_is_read_in_one_query(self):
+        Follow.objects.create(
+            user=UserStatsTests.follower, author=UserStatsTests.author
+        )
+        with self.assertNumQueries(1):
+            author = authors_with_stats(UserStatsTests.follower).get(
+                pk=UserStatsTests.author.pk
+            )
+            self.assertTrue(author.is_following)
+            self.assertEqual(author.stats.followers_count, 1)
+        response = self.follower_client.get(reverse(
+            'profile', kwargs={'username': UserStatsTests.author.username}
+        ))
+        self.assertContains(response, 'Подписчиков: 1')
+        self.assertContains(response, 'Отписаться')
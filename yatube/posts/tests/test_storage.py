@@ -0,0 +1,153 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from sorl.thumbnail import default
+from sorl.thumbnail.images import ImageFile
+
+from .. import thumbnails
+from ..models import Post
+from ..storage import ContentAddressedStorage, is_hashed
+
+User = get_user_model()
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+OTHER_GIF = SMALL_GIF[:-1] + b'\x00\x3B'
+
+
+@override_settings(
+    MEDIA_ROOT=tempfile.mkdtemp(dir=settings.BASE_DIR), THUMBNAIL_WORKERS=0
+)
+class ContentAddressedStorageTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='LionUser')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def create_post(self, name='small.gif', content=SMALL_GIF):
+        return Post.objects.create(
+            text='Some text about lions',
+            author=ContentAddressedStorageTests.author,
+            image=SimpleUploadedFile(name, content, 'image/gif'),
+        )
+
+    def test_identical_uploads_share_one_file(self):
+        first = self.create_post('lion.gif')
+        second = self.create_post('LION.GIF')
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertTrue(is_hashed(first.image.name))
+        self.assertRegex(first.image.name, r'^posts/\w\w/\w\w/\w{64}\.gif$')
+        self.assertEqual(
+            os.listdir(os.path.dirname(first.image.path)),
+            [os.path.basename(first.image.path)]
+        )
+
+    def test_file_is_deleted_with_last_reference(self):
+        first = self.create_post()
+        second = self.create_post()
+        path = first.image.path
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(os.path.exists(path))
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(os.path.exists(path))
+
+    def test_file_reused_while_released_is_put_back(self):
+        first = self.create_post()
+        path = first.image.path
+        set_aside = ContentAddressedStorage.set_aside
+
+        def upload_meanwhile(storage, name):
+            aside = set_aside(storage, name)
+            self.create_post()
+            return aside
+
+        with mock.patch.object(
+            ContentAddressedStorage, 'set_aside', upload_meanwhile
+        ), self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(os.path.exists(path))
+
+    def test_file_released_before_upload_commits_is_stored_again(self):
+        first = self.create_post()
+        path = first.image.path
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.create_post()
+        os.remove(path)
+        for callback in callbacks:
+            callback()
+        self.assertTrue(os.path.exists(path))
+
+    def test_replaced_image_is_released(self):
+        post = self.create_post()
+        path = post.image.path
+        client = Client()
+        client.force_login(ContentAddressedStorageTests.author)
+        with self.captureOnCommitCallbacks(execute=True):
+            client.post(
+                reverse('post_edit', kwargs={
+                    'username': post.author.username, 'post_id': post.pk,
+                }),
+                {
+                    'text': post.text,
+                    'image': SimpleUploadedFile(
+                        'other.gif', OTHER_GIF, 'image/gif'
+                    ),
+                }
+            )
+        post.refresh_from_db()
+        self.assertNotEqual(post.image.path, path)
+        self.assertTrue(os.path.exists(post.image.path))
+        self.assertFalse(os.path.exists(path))
+
+    def test_migrate_post_images(self):
+        legacy_dir = os.path.join(settings.MEDIA_ROOT, 'posts')
+        os.makedirs(legacy_dir, exist_ok=True)
+        posts = []
+        for number, content in enumerate((SMALL_GIF, SMALL_GIF, OTHER_GIF)):
+            name = f'posts/legacy{number}.gif'
+            with open(os.path.join(settings.MEDIA_ROOT, name), 'wb') as file:
+                file.write(content)
+            posts.append(Post.objects.create(
+                text='Old lions', author=self.author, image=name
+            ))
+        thumbnails.generate(posts[0].pk)
+        legacy_image = ImageFile(posts[0].image.name, posts[0].image.storage)
+        legacy_thumbnail = thumbnails.lookup(posts[0].image)
+        call_command(
+            'migrate_post_images', workers=2, batch_size=2, stdout=StringIO()
+        )
+        for post in posts:
+            post.refresh_from_db()
+            with self.subTest(post=post.pk):
+                self.assertTrue(is_hashed(post.image.name))
+                self.assertTrue(os.path.exists(post.image.path))
+                self.assertEqual(post.revision, 2)
+        self.assertEqual(posts[0].image.name, posts[1].image.name)
+        self.assertNotEqual(posts[0].image.name, posts[2].image.name)
+        self.assertFalse(
+            any(name.startswith('legacy') for name in os.listdir(legacy_dir))
+        )
+        self.assertIsNone(default.kvstore.get(legacy_image))
+        self.assertFalse(legacy_thumbnail.exists())
@@ -0,0 +1,174 @@
+import re
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+from sorl.thumbnail import default, delete
+from sorl.thumbnail.conf import settings as thumbnail_settings
+
+from .. import generations, thumbnails
+from ..models import Post
+
+User = get_user_model()
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(
+    MEDIA_ROOT=tempfile.mkdtemp(dir=settings.BASE_DIR), THUMBNAIL_WORKERS=0
+)
+class ThumbnailsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='LionUser')
+        cls.placeholder = thumbnails.placeholder().url
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.author_client = Client()
+        self.author_client.force_login(ThumbnailsTests.author)
+
+    def tearDown(self):
+        for post in Post.objects.exclude(image=''):
+            delete(post.image, delete_file=False)
+
+    def create_post(self, name='small.gif'):
+        return Post.objects.create(
+            text='Some text about lions',
+            author=ThumbnailsTests.author,
+            image=SimpleUploadedFile(
+                name, SMALL_GIF + name.encode(), 'image/gif'
+            ),
+        )
+
+    def create_photo_post(self, number):
+        photo = Image.radial_gradient('L').resize((1200, 600)).convert('RGB')
+        content = BytesIO()
+        photo.save(content, 'JPEG', quality=95)
+        return Post.objects.create(
+            text='Photo of lions',
+            author=ThumbnailsTests.author,
+            image=SimpleUploadedFile(
+                f'photo{number}.jpg', content.getvalue(), 'image/jpeg'
+            ),
+        )
+
+    def test_rendering_does_not_generate_thumbnails(self):
+        post = self.create_post()
+        response = self.author_client.get(reverse('index'))
+        self.assertContains(response, ThumbnailsTests.placeholder)
+        self.assertIsNone(thumbnails.lookup(post.image))
+
+    def test_new_post_generates_thumbnail_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author_client.post(reverse('new_post'), {
+                'text': 'Lions are here',
+                'image': SimpleUploadedFile('new.gif', SMALL_GIF, 'image/gif'),
+            })
+        post = Post.objects.get(text='Lions are here')
+        thumbnail = thumbnails.lookup(post.image)
+        self.assertIsNotNone(thumbnail)
+        response = self.author_client.get(reverse('index'))
+        self.assertContains(response, thumbnail.url)
+        self.assertNotContains(response, ThumbnailsTests.placeholder)
+
+    def test_pending_card_is_not_cached(self):
+        post = self.create_post()
+        self.author_client.get(reverse('index'))
+        thumbnails.generate(post.pk)
+        response = self.author_client.get(reverse('index'))
+        self.assertContains(response, thumbnails.lookup(post.image).url)
+
+    def test_pregenerate_thumbnails(self):
+        posts = [self.create_post(f'small{number}.gif') for number in range(3)]
+        thumbnails.generate(posts[0].pk)
+        out = StringIO()
+        with mock.patch.object(
+            generations, 'bump', wraps=generations.bump
+        ) as bump:
+            call_command('pregenerate_thumbnails', workers=1, stdout=out)
+        self.assertIn('2', out.getvalue())
+        bump.assert_called_once()
+        for post in posts:
+            with self.subTest(post=post.pk):
+                self.assertIsNotNone(thumbnails.lookup(post.image))
+
+    def test_variants_are_listed_in_srcset(self):
+        post = self.create_post()
+        thumbnails.generate(post.pk)
+        response = self.author_client.get(reverse('index'))
+        self.assertContains(response, '<source type="image/webp"')
+        for width in thumbnails.VARIANT_WIDTHS:
+            with self.subTest(width=width):
+                self.assertContains(response, f'.webp {width}w')
+
+    def test_measure_image_bytes(self):
+        for number in range(2):
+            self.create_photo_post(number)
+        out = StringIO()
+        call_command(
+            'measure_image_bytes', pages=1, widths=[360, 960], stdout=out
+        )
+        jpeg, small, large = map(
+            int, re.findall(r'(?:JPEG|px:) (\d+)', out.getvalue())
+        )
+        self.assertLess(small, large)
+        self.assertLess(small, jpeg)
+
+    def test_thumbnail_stored_by_another_process_is_found(self):
+        post = self.create_post()
+        self.assertIsNone(thumbnails.fetch([thumbnails.thumbnail_file(
+            post.image
+        )])[0])
+        with mock.patch.object(default.kvstore.cache, 'set'):
+            thumbnails.render([post.image.name])
+        self.assertFalse(thumbnails.is_pending(post.image))
+
+    def test_index_reads_kvstore_once(self):
+        for number in range(3):
+            thumbnails.generate(self.create_post(f'small{number}.gif').pk)
+        cache.clear()
+        kvstore_cache = default.kvstore.cache
+        prefix = thumbnail_settings.THUMBNAIL_KEY_PREFIX
+        with mock.patch.object(
+            default.kvstore, 'get', wraps=default.kvstore.get
+        ) as get, mock.patch.object(
+            kvstore_cache, 'get_many', wraps=kvstore_cache.get_many
+        ) as get_many, CaptureQueriesContext(connection) as queries:
+            response = self.author_client.get(reverse('index'))
+        self.assertContains(response, '.webp 480w', count=3)
+        get.assert_not_called()
+        self.assertEqual(
+            len([call for call in get_many.call_args_list
+                 if call.args[0][0].startswith(prefix)]),
+            1
+        )
+        self.assertEqual(
+            len([query for query in queries.captured_queries
+                 if 'thumbnail_kvstore' in query['sql']]),
+            1
+        )
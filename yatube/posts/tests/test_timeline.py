@@ -0,0 +1,118 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Follow, Post, TimelineEntry
+
+User = get_user_model()
+
+
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='LionUser')
+        cls.star = User.objects.create_user(username='LionKing')
+        cls.follower = User.objects.create_user(username='LionUserFan')
+        cls.old_post = Post.objects.create(
+            text='Post before follow',
+            author=cls.author,
+        )
+        cls.url_follow_index = reverse('follow_index')
+
+    def setUp(self):
+        self.follower_client = Client()
+        self.follower_client.force_login(TimelineTests.follower)
+
+    def follow(self, author):
+        self.follower_client.get(
+            reverse('profile_follow', kwargs={'username': author.username})
+        )
+
+    def timeline_post_ids(self):
+        return set(TimelineEntry.objects.filter(
+            user=TimelineTests.follower
+        ).values_list('post', flat=True))
+
+    def test_follow_backfills_timeline(self):
+        self.follow(TimelineTests.author)
+        self.assertEqual(
+            self.timeline_post_ids(), {TimelineTests.old_post.pk}
+        )
+
+    def test_new_post_is_fanned_out(self):
+        self.follow(TimelineTests.author)
+        post = Post.objects.create(
+            text='Fresh post', author=TimelineTests.author
+        )
+        self.assertIn(post.pk, self.timeline_post_ids())
+
+    def test_unfollow_trims_timeline(self):
+        self.follow(TimelineTests.author)
+        self.follower_client.get(reverse(
+            'profile_unfollow',
+            kwargs={'username': TimelineTests.author.username}
+        ))
+        self.assertEqual(self.timeline_post_ids(), set())
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_celebrity_posts_are_merged_at_read_time(self):
+        Follow.objects.create(
+            user=TimelineTests.author, author=TimelineTests.star
+        )
+        self.follow(TimelineTests.star)
+        self.follow(TimelineTests.author)
+        star_post = Post.objects.create(
+            text='Star post', author=TimelineTests.star
+        )
+        author_post = Post.objects.create(
+            text='Author post', author=TimelineTests.author
+        )
+        self.assertEqual(
+            self.timeline_post_ids(),
+            {TimelineTests.old_post.pk, author_post.pk}
+        )
+        response = self.follower_client.get(TimelineTests.url_follow_index)
+        self.assertEqual(
+            [post.pk for post in response.context['page']],
+            [author_post.pk, star_post.pk, TimelineTests.old_post.pk]
+        )
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_posts_stay_when_author_drops_below_limit(self):
+        other = User.objects.create_user(username='LionUserFan2')
+        Follow.objects.create(user=other, author=TimelineTests.star)
+        self.follow(TimelineTests.star)
+        star_post = Post.objects.create(
+            text='Star post', author=TimelineTests.star
+        )
+        self.assertNotIn(star_post.pk, self.timeline_post_ids())
+        Follow.objects.filter(user=other).delete()
+        self.assertIn(star_post.pk, self.timeline_post_ids())
+        response = self.follower_client.get(TimelineTests.url_follow_index)
+        self.assertIn(star_post, response.context['page'])
+
+    def test_follow_feed_pages_by_cursor(self):
+        self.follow(TimelineTests.author)
+        Post.objects.bulk_create(
+            Post(text=f'Post {number}', author=TimelineTests.author)
+            for number in range(12)
+        )
+        for post in Post.objects.exclude(pk=TimelineTests.old_post.pk):
+            TimelineEntry.objects.create(
+                user=TimelineTests.follower,
+                post=post,
+                author=TimelineTests.author,
+                pub_date=post.pub_date,
+            )
+        expected = list(Post.objects.order_by(
+            '-pub_date', '-pk'
+        ).values_list('pk', flat=True))
+        response = self.follower_client.get(TimelineTests.url_follow_index)
+        page = response.context['page']
+        seen = [post.pk for post in page]
+        response = self.follower_client.get(
+            TimelineTests.url_follow_index, {'cursor': page.next_cursor}
+        )
+        seen.extend(post.pk for post in response.context['page'])
+        self.assertEqual(seen, expected)
@@ -0,0 +1,54 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Post
+
+User = get_user_model()
+
+
+class ServerTimingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='LionUser')
+        Post.objects.create(text='Roar', author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+
+    def timings(self, response):
+        entries = {}
+        for entry in response['Server-Timing'].split(', '):
+            name, *params = entry.split(';')
+            entries[name] = dict(param.split('=') for param in params)
+        return entries
+
+    def test_header_has_time_per_category(self):
+        timings = self.timings(Client().get(reverse('index')))
+        for category in ('total', 'db', 'cache', 'template'):
+            with self.subTest(category=category):
+                self.assertGreater(float(timings[category]['dur']), 0)
+        self.assertGreater(int(timings['db']['desc'].strip('"')), 0)
+
+    def test_request_is_logged_as_json(self):
+        with self.assertLogs('yatube.timing', 'INFO') as logs:
+            Client().get(reverse(
+                'profile', kwargs={'username': ServerTimingTests.author}
+            ))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['status'], 200)
+        self.assertEqual(record['path'], f'/{ServerTimingTests.author}/')
+        self.assertGreater(record['db_count'], 0)
+        self.assertGreaterEqual(record['total_ms'], record['db_ms'])
+
+    def test_nested_renders_are_timed_once(self):
+        for number in range(4):
+            Post.objects.create(
+                text=f'Roar {number}', author=ServerTimingTests.author
+            )
+        timings = self.timings(Client().get(reverse('index')))
+        self.assertEqual(timings['template']['desc'], '"1"')
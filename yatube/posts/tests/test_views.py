@@ -4,12 +4,13 @@ from http import HTTPStatus
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls.base import reverse
 
 from ..forms import PostForm
-from ..models import Follow, Group, Post
+from ..models import Comment, Follow, Group, Post
 
 User = get_user_model()
 
@@ -96,6 +97,7 @@ class ViewsTests(TestCase):
         self.post_author_client.force_login(ViewsTests.author)
         self.follower.force_login(ViewsTests.follower)
         self.just_user.force_login(ViewsTests.just_user)
+        cache.clear()
 
     @classmethod
     def tearDownClass(cls):
@@ -191,19 +193,58 @@ class ViewsTests(TestCase):
                 )
 
     def test_cache_index(self):
-        Post.objects.create(
+        post = Post.objects.create(
             text='Test cache post',
             author=ViewsTests.author,
         )
         response = self.post_author_client.get(reverse('index'))
         cache_before = response.content
+        Post.objects.filter(pk=post.pk).update(text='Silently changed')
+        response = self.post_author_client.get(reverse('index'))
+        self.assertEqual(cache_before, response.content)
         Post.objects.create(
             text='Test cache post 2',
             author=ViewsTests.author,
         )
         response = self.post_author_client.get(reverse('index'))
-        cache_after = response.content
-        self.assertEqual(cache_before, cache_after)
+        self.assertNotEqual(cache_before, response.content)
+        self.assertContains(response, 'Test cache post 2')
+
+    def test_cache_feeds_invalidated_by_comment(self):
+        for url in (ViewsTests.url_index, ViewsTests.url_profile):
+            with self.subTest(url=url):
+                self.follower.get(url)
+                Comment.objects.create(
+                    post=ViewsTests.post,
+                    author=ViewsTests.follower,
+                    text='Fresh comment',
+                )
+                count = ViewsTests.post.comments.count()
+                response = self.follower.get(url)
+                self.assertContains(response, f'Комментариев: {count}')
+
+    def test_cache_follow_feed_invalidated_by_new_post(self):
+        self.follower.get(ViewsTests.url_follow_index)
+        Post.objects.create(
+            text='Fresh post for followers',
+            author=ViewsTests.author,
+        )
+        response = self.follower.get(ViewsTests.url_follow_index)
+        self.assertContains(response, 'Fresh post for followers')
+
+    def test_cache_follow_feed_shows_edits_and_comments(self):
+        self.follower.get(ViewsTests.url_follow_index)
+        post = Post.objects.get(pk=ViewsTests.post.pk)
+        post.text = 'Edited for followers'
+        post.save()
+        Comment.objects.create(
+            post=post, author=ViewsTests.follower, text='Fresh comment'
+        )
+        response = self.follower.get(ViewsTests.url_follow_index)
+        self.assertContains(response, 'Edited for followers')
+        self.assertContains(
+            response, f'Комментариев: {post.comments.count()}'
+        )
 
     def test_not_authorized_user_comment(self):
         response = self.guest_clent.post(ViewsTests.url_comment)
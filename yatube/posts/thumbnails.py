@@ -0,0 +1,261 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.templatetags.static import static
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import defaults as default_settings
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import (
+    DummyImageFile, ImageFile, deserialize_image_file
+)
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.kvstores.cached_db_kvstore import EMPTY_VALUE
+from sorl.thumbnail.kvstores.cached_db_kvstore import (
+    KVStore as CachedDbKVStore
+)
+from sorl.thumbnail.models import KVStore as KVStoreModel
+
+from yatube import timing
+
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+GEOMETRY = '960x339'
+OPTIONS = {'crop': 'center', 'upscale': True}
+
+VARIANT_WIDTHS = (480, 720, 960)
+VARIANT_FORMATS = {'WEBP': 'image/webp'}
+VARIANT_QUALITY = 80
+
+_executor = None
+_render_locks = [threading.Lock() for _ in range(64)]
+
+
+class PendingThumbnail(DummyImageFile):
+    @property
+    def url(self):
+        return static('posts/img/thumbnail-pending.svg')
+
+
+class LookupBackend(ThumbnailBackend):
+    """Resolves already generated thumbnails without ever creating one."""
+
+    def get_thumbnail_file(self, file_, geometry_string, **options):
+        source = ImageFile(file_)
+        if thumbnail_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(thumbnail_settings, attr)
+            if value != getattr(default_settings, attr):
+                options.setdefault(key, value)
+        name = self._get_thumbnail_filename(source, geometry_string, options)
+        return ImageFile(name, default.storage)
+
+
+backend = LookupBackend()
+
+
+def variant_geometry(width):
+    base_width, base_height = map(int, GEOMETRY.split('x'))
+    return f'{width}x{round(width * base_height / base_width)}'
+
+
+def variants():
+    """Yield ``(format, width, geometry, options)`` of every srcset variant."""
+    for format_ in VARIANT_FORMATS:
+        for width in VARIANT_WIDTHS:
+            options = dict(OPTIONS, format=format_, quality=VARIANT_QUALITY)
+            yield format_, width, variant_geometry(width), options
+
+
+def thumbnail_file(image, geometry=GEOMETRY, options=OPTIONS):
+    return backend.get_thumbnail_file(image, geometry, **options)
+
+
+def placeholder():
+    return PendingThumbnail(GEOMETRY)
+
+
+def fetch(files):
+    """Return the stored thumbnails for ``files``, ``None`` where missing.
+
+    With the ``cached_db`` kvstore all records are read with one cache
+    ``get_many`` and the cache misses with one query; other kvstores are
+    asked key by key.
+    """
+    if not files:
+        return []
+    with timing.measure('thumbnail'):
+        return read_stored(files)
+
+
+def read_stored(files):
+    """Read the kvstore records of ``files``, caching only stored ones.
+
+    Thumbnails are stored by other threads and processes, so a cached miss
+    would hide them; misses, including the ones sorl caches, go to the
+    database.
+    """
+    kvstore = default.kvstore
+    if not isinstance(kvstore, CachedDbKVStore):
+        return [kvstore.get(file_) for file_ in files]
+    keys = [add_prefix(file_.key) for file_ in files]
+    values = {
+        key: value for key, value in kvstore.cache.get_many(keys).items()
+        if value != EMPTY_VALUE
+    }
+    missing = [key for key in keys if key not in values]
+    if missing:
+        found = dict(
+            KVStoreModel.objects.filter(key__in=missing).values_list(
+                'key', 'value'
+            )
+        )
+        if found:
+            kvstore.cache.set_many(
+                found, thumbnail_settings.THUMBNAIL_CACHE_TIMEOUT
+            )
+        values.update(found)
+    return [
+        deserialize_image_file(values[key]) if key in values else None
+        for key in keys
+    ]
+
+
+def picture_files(image):
+    return [thumbnail_file(image)] + [
+        thumbnail_file(image, geometry, options)
+        for _, _, geometry, options in variants()
+    ]
+
+
+def build_picture(image, stored):
+    """Turn the stored ``picture_files`` of ``image`` into template data.
+
+    A format is listed in ``sources`` only once all of its widths are stored.
+    """
+    thumbnail, *stored_variants = stored
+    widths = {}
+    for (format_, width, _, _), variant in zip(variants(), stored_variants):
+        widths.setdefault(format_, []).append(
+            None if variant is None else (width, variant)
+        )
+    sources = [
+        {
+            'type': VARIANT_FORMATS[format_],
+            'srcset': ', '.join(
+                f'{variant.url} {width}w' for width, variant in stored_widths
+            ),
+        }
+        for format_, stored_widths in widths.items() if all(stored_widths)
+    ]
+    return {
+        'image': image,
+        'thumbnail': thumbnail or placeholder(),
+        'sources': sources if thumbnail else [],
+        'pending': (
+            thumbnail is None or len(sources) < len(VARIANT_FORMATS)
+        ),
+    }
+
+
+def picture(image):
+    if not image:
+        return {'image': image, 'pending': False}
+    return build_picture(image, fetch(picture_files(image)))
+
+
+def prefetch(posts):
+    """Attach ``picture`` to every post of ``posts`` with one kvstore read."""
+    posts = [post for post in posts if not hasattr(post, 'picture')]
+    files = [
+        picture_files(post.image) if post.image else [] for post in posts
+    ]
+    stored = iter(fetch([file_ for group in files for file_ in group]))
+    for post, group in zip(posts, files):
+        if post.image:
+            post.picture = build_picture(
+                post.image, [next(stored) for _ in group]
+            )
+        else:
+            post.picture = picture(post.image)
+
+
+def lookup(image):
+    """Return the stored thumbnail of ``image`` or ``None`` if pending."""
+    if not image:
+        return None
+    return fetch([thumbnail_file(image)])[0]
+
+
+def is_pending(image):
+    return picture(image)['pending']
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.THUMBNAIL_WORKERS,
+            thread_name_prefix='thumbnails',
+        )
+    return _executor
+
+
+def render(names):
+    """Generate thumbnails of the image ``names``, safe to run in a child.
+
+    Identical uploads share a name, so threads rendering the same name take
+    turns and the later one finds the thumbnails stored.
+    """
+    close_old_connections()
+    try:
+        storage = Post._meta.get_field('image').storage
+        for name in names:
+            with _render_locks[hash(name) % len(_render_locks)]:
+                source = ImageFile(name, storage)
+                get_thumbnail(source, GEOMETRY, **OPTIONS)
+                for _, _, geometry, options in variants():
+                    get_thumbnail(source, geometry, **options)
+    finally:
+        close_old_connections()
+    return names
+
+
+def generate(post_id):
+    from .generations import bump_post
+
+    close_old_connections()
+    try:
+        post = Post.objects.only('image', 'author', 'group').filter(
+            pk=post_id
+        ).first()
+        if post is None or not post.image:
+            return
+        render([post.image.name])
+        bump_post(post)
+    except Exception:
+        logger.exception('Thumbnail generation failed for post %s', post_id)
+    finally:
+        close_old_connections()
+
+
+def schedule(post):
+    """Generate the thumbnail of ``post`` on the worker pool after commit.
+
+    With ``THUMBNAIL_WORKERS = 0`` it is generated inline instead.
+    """
+    if not post.image:
+        return
+    post_id = post.pk
+    if settings.THUMBNAIL_WORKERS:
+        transaction.on_commit(lambda: get_executor().submit(generate, post_id))
+    else:
+        transaction.on_commit(lambda: generate(post_id))
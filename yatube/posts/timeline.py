@@ -0,0 +1,152 @@
+from itertools import islice
+
+from django.conf import settings
+from django.utils.functional import cached_property
+
+from . import generations
+from .models import Follow, Post, TimelineEntry, UserStats
+from .paginator import CursorPaginator
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def is_celebrity(author_id):
+    return UserStats.objects.filter(
+        user_id=author_id,
+        followers_count__gt=settings.TIMELINE_FANOUT_LIMIT,
+    ).exists()
+
+
+def celebrity_ids(user):
+    return list(Follow.objects.filter(
+        user=user,
+        author__stats__followers_count__gt=settings.TIMELINE_FANOUT_LIMIT,
+    ).values_list('author', flat=True))
+
+
+def fan_out(post):
+    if is_celebrity(post.author_id):
+        return
+    follower_ids = Follow.objects.filter(
+        author_id=post.author_id
+    ).values_list('user', flat=True).iterator()
+    write(follower_ids, post.author_id, [(post.pk, post.pub_date)])
+
+
+def write(user_ids, author_id, posts):
+    """Add ``posts`` to the timelines of ``user_ids`` and bump their feeds."""
+    if not posts:
+        return
+    users_per_chunk = max(settings.TIMELINE_BATCH_SIZE // len(posts), 1)
+    for chunk in chunked(user_ids, users_per_chunk):
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(
+                    user_id=user_id,
+                    post_id=post_id,
+                    author_id=author_id,
+                    pub_date=pub_date,
+                ) for user_id in chunk for post_id, pub_date in posts
+            ],
+            ignore_conflicts=True,
+        )
+        generations.bump(
+            *(generations.follow_scope(user_id) for user_id in chunk)
+        )
+
+
+def recent_posts(author_id):
+    return list(Post.objects.filter(author_id=author_id).order_by(
+        '-pub_date', '-pk'
+    ).values_list('pk', 'pub_date')[:settings.TIMELINE_BACKFILL])
+
+
+def backfill(follow):
+    if is_celebrity(follow.author_id):
+        return
+    write([follow.user_id], follow.author_id, recent_posts(follow.author_id))
+
+
+def backfill_followers(author_id):
+    """Fan out the recent posts of an author who is no longer a celebrity.
+
+    Posts written above ``TIMELINE_FANOUT_LIMIT`` were only merged in at
+    read time and would drop out of the feeds once the author falls back
+    under the limit, so they are written when an unfollow brings the
+    author down to it.
+    """
+    followers_count = UserStats.objects.filter(
+        user_id=author_id
+    ).values_list('followers_count', flat=True).first()
+    if followers_count != settings.TIMELINE_FANOUT_LIMIT:
+        return
+    follower_ids = Follow.objects.filter(
+        author_id=author_id
+    ).values_list('user', flat=True).iterator()
+    write(follower_ids, author_id, recent_posts(author_id))
+
+
+def trim(follow):
+    TimelineEntry.objects.filter(
+        user_id=follow.user_id, author_id=follow.author_id
+    ).delete()
+
+
+class TimelinePaginator(CursorPaginator):
+    """Cursor paginator over the materialized follow feed of ``user``.
+
+    Fanned-out entries are read with one range scan of the timeline index;
+    posts of authors above ``TIMELINE_FANOUT_LIMIT`` are merged in at read
+    time. ``object_list`` is only used for legacy ``?page=N`` links.
+    """
+
+    def __init__(self, user, per_page, **kwargs):
+        self.user = user
+        super().__init__(
+            Post.objects.feed().filter(author__following__user=user),
+            per_page,
+            **kwargs
+        )
+
+    @cached_property
+    def celebrity_ids(self):
+        return celebrity_ids(self.user)
+
+    def get_window(self, position, backwards, limit):
+        sources = [
+            self.slice(
+                TimelineEntry.objects.filter(user=self.user),
+                ('pub_date', 'post_id'), position, backwards, limit
+            )
+        ]
+        if self.celebrity_ids:
+            sources.append(self.slice(
+                Post.objects.filter(author__in=self.celebrity_ids),
+                ('pub_date', 'pk'), position, backwards, limit
+            ))
+        window = sorted(
+            {pk: pub_date for source in sources for pub_date, pk in source}
+            .items(),
+            key=lambda item: (item[1], item[0]),
+            reverse=not backwards,
+        )[:limit]
+        posts = Post.objects.feed().in_bulk([pk for pk, _ in window])
+        return [posts[pk] for pk, _ in window if pk in posts]
+
+    def slice(self, queryset, keys, position, backwards, limit):
+        first, second = keys
+        queryset = queryset.order_by(f'-{first}', f'-{second}')
+        if position is not None:
+            queryset = queryset.filter(
+                self.keyset_filter(position, backwards, keys)
+            )
+        if backwards:
+            queryset = queryset.reverse()
+        return queryset.values_list(first, second)[:limit]
@@ -0,0 +1,190 @@
+import threading
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import wraps
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from PIL import Image
+
+from yatube import metrics
+
+SIGNATURES = (
+    (b'\xff\xd8\xff', 'JPEG'),
+    (b'\x89PNG\r\n\x1a\n', 'PNG'),
+    (b'GIF87a', 'GIF'),
+    (b'GIF89a', 'GIF'),
+)
+HEADER_SIZE = 12
+
+_executor = None
+_slots = None
+_lock = threading.Lock()
+
+
+def sniff(header):
+    """Return the image format ``header`` starts with or ``None``."""
+    for signature, format_ in SIGNATURES:
+        if header.startswith(signature):
+            return format_
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'WEBP'
+    return None
+
+
+class ImageUploadHandler(TemporaryFileUploadHandler):
+    """Streams uploads to a temporary file chunk by chunk.
+
+    The format is sniffed from the first bytes and nothing more is written
+    once the upload is not an image or grows past ``POST_IMAGE_MAX_SIZE``.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.header = b''
+        self.received = 0
+        self.file.image_format = None
+        self.file.oversized = False
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if len(self.header) < HEADER_SIZE:
+            self.header += raw_data[:HEADER_SIZE - len(self.header)]
+            self.file.image_format = sniff(self.header)
+        if self.received > settings.POST_IMAGE_MAX_SIZE:
+            self.file.oversized = True
+        if self.file.oversized or (
+            len(self.header) >= HEADER_SIZE and not self.file.image_format
+        ):
+            return None
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        metrics.observe('yatube_upload_size_bytes', self.received)
+        return super().file_complete(file_size)
+
+
+def image_uploads(view):
+    """Parse the request body of ``view`` with ``ImageUploadHandler``.
+
+    Upload handlers can only be replaced before the body is read, and the
+    CSRF middleware reads it to find the token, so the view is exempt from
+    the middleware and checks the token once the handler is installed.
+    """
+    protected_view = csrf_protect(view)
+
+    @wraps(view)
+    def wrapped_view(request, *args, **kwargs):
+        request.upload_handlers = [ImageUploadHandler(request)]
+        return protected_view(request, *args, **kwargs)
+    return csrf_exempt(wrapped_view)
+
+
+def decode(source, max_pixels):
+    """Fully decode ``source`` and report whether it is a sane image.
+
+    Runs in a child process so a decompression bomb only costs the child.
+    """
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    try:
+        with Image.open(source) as image:
+            image.load()
+    except (Image.DecompressionBombError, OSError, SyntaxError, ValueError):
+        return False
+    return True
+
+
+def get_executor():
+    global _executor, _slots
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.UPLOAD_CHECK_WORKERS
+            )
+            _slots = threading.BoundedSemaphore(
+                settings.UPLOAD_CHECK_WORKERS * 2
+            )
+    return _executor, _slots
+
+
+def discard(executor):
+    """Drop a broken ``executor`` so the next check starts a fresh pool."""
+    global _executor, _slots
+    with _lock:
+        if _executor is executor:
+            _executor = _slots = None
+    executor.shutdown(wait=False)
+
+
+def decodes_safely(upload):
+    """Decode ``upload`` in the process pool within the configured timeout.
+
+    At most two checks per worker are queued; when all slots stay busy for
+    the whole timeout the upload is rejected rather than queued. A slot is
+    freed when its decode finishes, so checks the request stopped waiting
+    for still count. A child killed while decoding, say by the OOM killer,
+    breaks the pool: the upload is rejected and the pool replaced.
+    """
+    if hasattr(upload, 'temporary_file_path'):
+        source = upload.temporary_file_path()
+    else:
+        upload.seek(0)
+        source = BytesIO(upload.read())
+    executor, slots = get_executor()
+    timeout = settings.UPLOAD_CHECK_TIMEOUT
+    if not slots.acquire(timeout=timeout):
+        return False
+    try:
+        future = executor.submit(
+            decode, source, settings.POST_IMAGE_MAX_PIXELS
+        )
+    except BrokenExecutor:
+        slots.release()
+        discard(executor)
+        return False
+    except BaseException:
+        slots.release()
+        raise
+    future.add_done_callback(lambda future: slots.release())
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeoutError:
+        future.cancel()
+        return False
+    except BrokenExecutor:
+        discard(executor)
+        return False
+
+
+def check(upload):
+    """Return why ``upload`` is not an acceptable post image or ``None``.
+
+    Cheap checks come first: the size counted while streaming, the sniffed
+    format and the dimensions from the header. Only then is the image decoded,
+    in the process pool.
+    """
+    max_size = settings.POST_IMAGE_MAX_SIZE
+    if getattr(upload, 'oversized', False) or upload.size > max_size:
+        return f'Картинка больше {max_size // (1024 * 1024)} МБ'
+    image_format = getattr(upload, 'image_format', None)
+    if image_format is None:
+        upload.seek(0)
+        image_format = sniff(upload.read(HEADER_SIZE))
+    if image_format is None:
+        return 'Загрузите картинку в формате JPEG, PNG, GIF или WebP'
+    upload.seek(0)
+    try:
+        with Image.open(upload) as image:
+            width, height = image.size
+    except (Image.DecompressionBombError, OSError, SyntaxError):
+        return 'Не удалось прочитать картинку'
+    finally:
+        upload.seek(0)
+    if width * height > settings.POST_IMAGE_MAX_PIXELS:
+        return 'Картинка слишком большая по количеству пикселей'
+    if not decodes_safely(upload):
+        return 'Не удалось прочитать картинку'
+    upload.seek(0)
+    return None
@@ -1,53 +1,114 @@
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.contrib.auth.views import redirect_to_login
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 
+from . import generations, stats, thumbnails
+from .async_orm import run_sync
+from .conditional import (
+    conditional_page, group_scopes, index_scopes, post_scopes, profile_scopes
+)
 from .forms import CommentForm, PostForm
 from .models import Follow, Group, Post, User
+from .paginator import CursorPaginator
+from .search import SearchPaginator, search_available
+from .stats import authors_with_stats
+from .timeline import TimelinePaginator
+from .uploads import image_uploads
 
 
+def get_comments_page(request, post):
+    paginator = CursorPaginator(
+        post.comments.select_related('author').only(
+            'text', 'created', 'post', 'author__username'
+        ),
+        settings.COMMENTS_AMOUNT,
+        ordering=('-created', '-pk'),
+    )
+    return paginator.get_cursor_page(request.GET.get('cursor'))
+
+
+@conditional_page(index_scopes)
 def index(request):
-    post_list = Post.objects.all()
-    paginator = Paginator(post_list, settings.PAGES_AMOUNT)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    return render(request, 'posts/index.html', {'page': page})
+    cache_version = generations.get_version(generations.index_scope())
+    post_list = Post.objects.feed()
+    paginator = CursorPaginator(post_list, settings.PAGES_AMOUNT)
+    page = paginator.get_request_page(request)
+    return render(
+        request,
+        'posts/index.html',
+        {'page': page, 'cache_version': cache_version}
+    )
 
 
+def search(request):
+    query = request.GET.get('q', '').strip()
+    page = None
+    if query:
+        if search_available():
+            paginator = SearchPaginator(query, settings.PAGES_AMOUNT)
+        else:
+            paginator = CursorPaginator(
+                Post.objects.feed().filter(text__icontains=query),
+                settings.PAGES_AMOUNT
+            )
+        page = paginator.get_cursor_page(request.GET.get('cursor'))
+    return render(
+        request, 'posts/search.html', {'query': query, 'page': page}
+    )
+
+
+@conditional_page(group_scopes)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    post_list = group.groups.all()
-    paginator = Paginator(post_list, settings.PAGES_AMOUNT)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    return render(request, 'posts/group.html', {'group': group, 'page': page})
+    cache_version = generations.get_version(generations.group_scope(group.pk))
+    post_list = Post.objects.feed().filter(group=group)
+    paginator = CursorPaginator(post_list, settings.PAGES_AMOUNT)
+    page = paginator.get_request_page(request)
+    return render(
+        request,
+        'posts/group.html',
+        {'group': group, 'page': page, 'cache_version': cache_version}
+    )
 
 
+@conditional_page(profile_scopes)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    profile_post_list = author.posts.all()
-    paginator = Paginator(profile_post_list, settings.PAGES_AMOUNT)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    following = request.user.is_authenticated and (
-        Follow.objects.filter(user=request.user, author=author).exists())
+    author = get_object_or_404(
+        authors_with_stats(request.user), username=username
+    )
+    cache_version = generations.get_version(
+        generations.profile_scope(author.pk)
+    )
+    profile_post_list = Post.objects.feed().filter(author=author)
+    paginator = CursorPaginator(profile_post_list, settings.PAGES_AMOUNT)
+    page = paginator.get_request_page(request)
     return render(
         request,
         'posts/profile.html',
-        {'author': author, 'page': page, 'following': following}
+        {
+            'author': author,
+            'page': page,
+            'following': author.is_following,
+            'cache_version': cache_version,
+        }
     )
 
 
+@conditional_page(post_scopes)
 def post_view(request, username, post_id):
-    post = get_object_or_404(Post, pk=post_id, author__username=username)
-    author = post.author
-    comments = post.comments.all()
+    post = get_object_or_404(
+        Post.objects.feed(), pk=post_id, author__username=username
+    )
+    author = authors_with_stats(request.user).get(pk=post.author_id)
+    comments = get_comments_page(request, post)
     form = CommentForm()
     return render(
         request, 'posts/post.html', {
             'post': post,
             'author': author,
+            'following': author.is_following,
             'comments': comments,
             'form': form
         }
@@ -55,6 +116,7 @@ def post_view(request, username, post_id):
 
 
 @login_required
+@image_uploads
 def new_post(request):
     is_new = True
     form = PostForm(
@@ -70,10 +132,12 @@ def new_post(request):
     post = form.save(commit=False)
     post.author = request.user
     post.save()
+    thumbnails.schedule(post)
     return redirect('index')
 
 
 @login_required
+@image_uploads
 def post_edit(request, username, post_id):
     is_new = False
     post = get_object_or_404(Post, pk=post_id, author__username=username)
@@ -86,6 +150,8 @@ def post_edit(request, username, post_id):
     )
     if form.is_valid():
         post.save()
+        if 'image' in form.changed_data:
+            thumbnails.schedule(post)
         return redirect('post', username, post_id)
     return render(
         request,
@@ -110,7 +176,7 @@ def server_error(request):
 @login_required
 def add_comment(request, username, post_id):
     post = get_object_or_404(Post, pk=post_id, author__username=username)
-    comments = post.comments.all()
+    comments = get_comments_page(request, post)
     form = CommentForm(
         request.POST or None
     )
@@ -127,26 +193,83 @@ def add_comment(request, username, post_id):
     return redirect('post', username, post_id)
 
 
+def post_comments(request, username, post_id):
+    post = get_object_or_404(
+        Post.objects.select_related('author').only('author__username'),
+        pk=post_id,
+        author__username=username
+    )
+    comments = get_comments_page(request, post)
+    return render(
+        request,
+        'posts/include/comment_list.html',
+        {'post': post, 'comments': comments}
+    )
+
+
 @login_required
 def follow_index(request):
-    post_list = Post.objects.filter(author__following__user=request.user)
-    paginator = Paginator(post_list, settings.PAGES_AMOUNT)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    return render(request, 'posts/follow.html', {'page': page})
+    paginator = TimelinePaginator(request.user, settings.PAGES_AMOUNT)
+    cache_version = generations.follow_version(
+        request.user, paginator.celebrity_ids
+    )
+    page = paginator.get_request_page(request)
+    return render(
+        request,
+        'posts/follow.html',
+        {'page': page, 'cache_version': cache_version}
+    )
 
 
-@login_required
-def profile_follow(request, username):
-    author = get_object_or_404(User, username=username)
+async def is_authenticated(request):
+    """Resolve the lazy ``request.user`` without blocking the event loop."""
+    return await run_sync(request, lambda: request.user.is_authenticated)
+
+
+async def profile_follow(request, username):
+    if not await is_authenticated(request):
+        return redirect_to_login(request.get_full_path())
+    author = await run_sync(
+        request, get_object_or_404, User, username=username
+    )
     if author != request.user:
-        Follow.objects.get_or_create(author=author, user=request.user)
+        await run_sync(
+            request, Follow.objects.get_or_create,
+            author=author, user=request.user
+        )
     return redirect('profile', username)
 
 
-@login_required
-def profile_unfollow(request, username):
-    author = get_object_or_404(User, username=username)
+async def profile_unfollow(request, username):
+    if not await is_authenticated(request):
+        return redirect_to_login(request.get_full_path())
+    author = await run_sync(
+        request, get_object_or_404, User, username=username
+    )
     if author != request.user:
-        Follow.objects.filter(author=author, user=request.user).delete()
+        await run_sync(
+            request,
+            Follow.objects.filter(author=author, user=request.user).delete
+        )
     return redirect('profile', username)
+
+
+async def profile_stats(request, username):
+    counters = await run_sync(request, stats.read, username)
+    if counters is None:
+        raise Http404
+    return JsonResponse({
+        'posts': counters['posts_count'],
+        'followers': counters['followers_count'],
+        'following': counters['following_count'],
+    })
+
+
+async def post_stats(request, username, post_id):
+    post = await run_sync(
+        request, get_object_or_404,
+        Post.objects.with_comments_count().values('comments_count'),
+        pk=post_id,
+        author__username=username
+    )
+    return JsonResponse({'comments': post['comments_count']})
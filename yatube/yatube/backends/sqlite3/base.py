@@ -0,0 +1,67 @@
+"""SQLite backend with connection pragmas and health checks.
+
+``PRAGMAS`` of the database settings are run on every new connection.
+Django 3.2 does not check persistent connections, so with ``CONN_MAX_AGE``
+a kept connection is checked before its first use in a request: it is
+replaced when a trivial query fails or the database file was swapped, as
+``copy_sqlite_replicas`` does.
+"""
+import os
+import sqlite3
+from urllib.parse import urlsplit
+
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    health_check_done = False
+    file_id = None
+
+    def database_file(self):
+        if self.is_in_memory_db():
+            return None
+        name = self.settings_dict['NAME']
+        if name.startswith('file:'):
+            name = urlsplit(name).path
+        return name
+
+    def stat_file(self):
+        path = self.database_file()
+        if path is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_dev, stat.st_ino
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        for name, value in self.settings_dict.get('PRAGMAS', {}).items():
+            connection.execute(f'PRAGMA {name} = {value}')
+        self.file_id = self.stat_file()
+        return connection
+
+    def connect(self):
+        super().connect()
+        self.health_check_done = True
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        self.health_check_done = False
+
+    def ensure_connection(self):
+        if self.connection is not None and not self.health_check_done:
+            self.health_check_done = True
+            if not self.in_atomic_block and not self.is_healthy():
+                self.close()
+        super().ensure_connection()
+
+    def is_healthy(self):
+        if self.stat_file() != self.file_id:
+            return False
+        try:
+            self.connection.execute('SELECT 1').fetchone()
+        except sqlite3.Error:
+            return False
+        return True
@@ -0,0 +1,305 @@
+"""Request, cache and upload metrics in the Prometheus text format.
+
+Every process keeps its own registry. With ``METRICS_DIR`` set, each
+process also writes its registry to a file of its own in that directory at
+most every ``METRICS_FLUSH_INTERVAL`` seconds, and the endpoint adds up
+all files, so a prefork server reports the numbers of all its workers.
+Files of exited workers keep counting; clear the directory on deploy.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.kvstores.cached_db_kvstore import EMPTY_VALUE
+
+from . import timing
+from .middleware import AsyncCapableMiddleware
+
+HISTOGRAMS = {
+    'yatube_request_duration_seconds': (
+        0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+    ),
+    'yatube_request_queries': (0, 1, 2, 5, 10, 20, 50, 100),
+    'yatube_upload_size_bytes': tuple(
+        2 ** power * 1024 for power in range(6, 17, 2)
+    ),
+}
+HELP = {
+    'yatube_requests_total': 'Responses by view and status.',
+    'yatube_request_duration_seconds': 'Request latency by view.',
+    'yatube_request_queries': 'SQL queries per request by view.',
+    'yatube_cache_hits_total': 'Cache hits by key family.',
+    'yatube_cache_misses_total': 'Cache misses by key family.',
+    'yatube_upload_size_bytes': 'Sizes of uploaded files.',
+}
+FRAGMENT_PREFIX = 'template.cache.'
+KEY_FAMILIES = (
+    ('posts:card:', 'post_cards'),
+    ('posts:generation:', 'generations'),
+)
+MISSING = object()
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.pid = os.getpid()
+        self.counters = {}
+        self.histograms = {}
+        self.path = None
+        self.flushed = 0
+
+    def check_fork(self):
+        """Forget what the parent recorded before forking this worker."""
+        if self.pid != os.getpid():
+            self.reset()
+
+    def inc(self, name, labels=(), value=1):
+        with self.lock:
+            self.check_fork()
+            key = (name, labels)
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, labels=()):
+        buckets = HISTOGRAMS[name]
+        with self.lock:
+            self.check_fork()
+            key = (name, labels)
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [0] * (len(buckets) + 3)
+            histogram[bisect_left(buckets, value)] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+
+    def dump(self):
+        with self.lock:
+            self.check_fork()
+            return {
+                'counters': [
+                    [name, labels, value]
+                    for (name, labels), value in self.counters.items()
+                ],
+                'histograms': [
+                    [name, labels, values]
+                    for (name, labels), values in self.histograms.items()
+                ],
+            }
+
+    def flush(self):
+        directory = settings.METRICS_DIR
+        if not directory:
+            return
+        with self.flush_lock:
+            data = self.dump()
+            if self.path is None:
+                self.path = os.path.join(
+                    directory, f'{os.getpid()}-{uuid.uuid4().hex}.json'
+                )
+            part = f'{self.path}.part'
+            with open(part, 'w') as file:
+                json.dump(data, file)
+            os.replace(part, self.path)
+            self.flushed = time.monotonic()
+
+    def maybe_flush(self):
+        if (
+            settings.METRICS_DIR
+            and time.monotonic() - self.flushed
+            >= settings.METRICS_FLUSH_INTERVAL
+        ):
+            self.flush()
+
+
+registry = Registry()
+atexit.register(registry.flush)
+
+
+def inc(name, labels=(), value=1):
+    registry.inc(name, labels, value)
+
+
+def observe(name, value, labels=()):
+    registry.observe(name, value, labels)
+
+
+def cache_family(key):
+    if key.startswith(FRAGMENT_PREFIX):
+        return key[len(FRAGMENT_PREFIX):].partition('.')[0]
+    if key.startswith(thumbnail_settings.THUMBNAIL_KEY_PREFIX):
+        return 'thumbnails'
+    for prefix, family in KEY_FAMILIES:
+        if key.startswith(prefix):
+            return family
+    return 'other'
+
+
+def record_cache(keys, values):
+    hits, misses = {}, {}
+    for key in keys:
+        family = cache_family(key)
+        # sorl caches missing thumbnails as EMPTY_VALUE.
+        found = key in values and values[key] != EMPTY_VALUE
+        counts = hits if found else misses
+        counts[family] = counts.get(family, 0) + 1
+    for name, counts in (
+        ('yatube_cache_hits_total', hits),
+        ('yatube_cache_misses_total', misses),
+    ):
+        for family, count in counts.items():
+            inc(name, (('family', family),), count)
+
+
+class MeteredCache(timing.TimedCache):
+    """Timed cache that also counts hits and misses per key family."""
+
+    def get(self, key, default=None, version=None):
+        with timing.measure('cache'):
+            value = self.backend.get(key, MISSING, version)
+        found = value is not MISSING
+        record_cache([key], {key: value} if found else {})
+        return value if found else default
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        with timing.measure('cache'):
+            values = self.backend.get_many(keys, version)
+        record_cache(keys, values)
+        return values
+
+
+class MetricsMiddleware(AsyncCapableMiddleware):
+    """Records latency, status and query count under the URL name.
+
+    Must come after ``ServerTimingMiddleware``, which counts the queries.
+    """
+
+    def handle(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        return self.record(request, response, started)
+
+    async def ahandle(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        return self.record(request, response, started)
+
+    def record(self, request, response, started):
+        elapsed = time.perf_counter() - started
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        labels = (('view', view),)
+        inc(
+            'yatube_requests_total',
+            labels + (('status', str(response.status_code)),)
+        )
+        observe('yatube_request_duration_seconds', elapsed, labels)
+        timings = timing.current()
+        if timings is not None:
+            observe(
+                'yatube_request_queries', timings.counts.get('db', 0), labels
+            )
+        registry.maybe_flush()
+        return response
+
+
+def collect():
+    """Add up the registries of all processes."""
+    if not settings.METRICS_DIR:
+        dumps = [registry.dump()]
+    else:
+        registry.flush()
+        dumps = []
+        for name in os.listdir(settings.METRICS_DIR):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(settings.METRICS_DIR, name)) as file:
+                    dumps.append(json.load(file))
+            except (OSError, ValueError):
+                continue
+    counters, histograms = {}, {}
+    for dump in dumps:
+        for name, labels, value in dump['counters']:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, values in dump['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            total = histograms.setdefault(key, [0] * len(values))
+            for index, value in enumerate(values):
+                total[index] += value
+    return counters, histograms
+
+
+def escape(value):
+    return (
+        value.replace('\\', '\\\\').replace('"', '\\"')
+        .replace('\n', '\\n')
+    )
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(f'{name}="{escape(value)}"' for name, value in labels)
+    return '{' + pairs + '}'
+
+
+def exposition(counters, histograms):
+    lines = []
+    for metric_type, metrics in (
+        ('counter', counters), ('histogram', histograms)
+    ):
+        for name in sorted({name for name, _ in metrics}):
+            lines.append(f'# HELP {name} {HELP[name]}')
+            lines.append(f'# TYPE {name} {metric_type}')
+            for (metric, labels), value in sorted(metrics.items()):
+                if metric != name:
+                    continue
+                if metric_type == 'counter':
+                    lines.append(f'{name}{format_labels(labels)} {value}')
+                    continue
+                cumulative = 0
+                bounds = HISTOGRAMS[name] + ('+Inf',)
+                for bound, count in zip(bounds, value):
+                    cumulative += count
+                    lines.append(
+                        f'{name}_bucket'
+                        f'{format_labels(labels + (("le", str(bound)),))} '
+                        f'{cumulative}'
+                    )
+                lines.append(f'{name}_sum{format_labels(labels)} {value[-2]}')
+                lines.append(
+                    f'{name}_count{format_labels(labels)} {value[-1]}'
+                )
+    return '\n'.join(lines) + '\n'
+
+
+def authorized(request):
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    return (
+        settings.METRICS_TOKEN is not None
+        and scheme == 'Bearer'
+        and constant_time_compare(token, settings.METRICS_TOKEN)
+    )
+
+
+def metrics_view(request):
+    if not authorized(request):
+        raise Http404
+    return HttpResponse(
+        exposition(*collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
@@ -0,0 +1,30 @@
+import asyncio
+
+
+class AsyncCapableMiddleware:
+    """Middleware that runs natively in both sync and async stacks.
+
+    Subclasses implement ``handle`` for a sync ``get_response`` and the
+    coroutine ``ahandle`` for an async one, so an ASGI request is not
+    switched to a thread and back at every layer.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Django 3.2 recognizes async middleware instances by this
+            # marker, as set by MiddlewareMixin.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.ahandle(request)
+        return self.handle(request)
+
+    def handle(self, request):
+        raise NotImplementedError
+
+    async def ahandle(self, request):
+        raise NotImplementedError
@@ -0,0 +1,126 @@
+"""Read replicas with read-your-writes stickiness.
+
+Reads of a ``GET`` or ``HEAD`` request go to one of
+``DATABASE_REPLICAS``. Everything else uses ``default``: writes, reads
+outside requests, reads after the request has written, and every read of
+a client that wrote within the last ``REPLICA_STICKY_SECONDS``, which a
+cookie marks. Sessions, users and content types are always read from
+``default``: a login or a signup is read back by requests that carry no
+sticky cookie yet. A replica that cannot be connected to is skipped for
+``REPLICA_RETRY_SECONDS``.
+"""
+import logging
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from .middleware import AsyncCapableMiddleware
+
+STICKY_COOKIE = 'primary'
+PRIMARY_APP_LABELS = frozenset(('sessions', 'auth', 'contenttypes'))
+
+logger = logging.getLogger(__name__)
+
+_routing = ContextVar('database_routing', default=None)
+_down_until = {}
+
+
+class Routing:
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.replica = None
+        self.wrote = False
+
+
+def use_primary():
+    """Send the remaining reads of the current request to ``default``."""
+    routing = _routing.get()
+    if routing is not None:
+        routing.use_replica = False
+
+
+def available(alias):
+    """Check that ``alias`` accepts connections, remembering failures."""
+    if _down_until.get(alias, 0) > time.monotonic():
+        return False
+    try:
+        connections[alias].ensure_connection()
+    except DatabaseError:
+        logger.warning('Replica %s is unavailable', alias, exc_info=True)
+        _down_until[alias] = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+        return False
+    _down_until.pop(alias, None)
+    return True
+
+
+def pick_replica():
+    replicas = list(settings.DATABASE_REPLICAS)
+    random.shuffle(replicas)
+    for alias in replicas:
+        if available(alias):
+            return alias
+    return DEFAULT_DB_ALIAS
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        routing = _routing.get()
+        if (
+            routing is None or not routing.use_replica or routing.wrote
+            or model._meta.app_label in PRIMARY_APP_LABELS
+        ):
+            return DEFAULT_DB_ALIAS
+        if routing.replica is None:
+            routing.replica = pick_replica()
+        return routing.replica
+
+    def db_for_write(self, model, **hints):
+        routing = _routing.get()
+        if routing is not None:
+            routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaRoutingMiddleware(AsyncCapableMiddleware):
+    def handle(self, request):
+        routing = self.start(request)
+        token = _routing.set(routing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+        return self.finish(routing, response)
+
+    async def ahandle(self, request):
+        routing = self.start(request)
+        token = _routing.set(routing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _routing.reset(token)
+        return self.finish(routing, response)
+
+    def start(self, request):
+        return Routing(
+            use_replica=bool(settings.DATABASE_REPLICAS)
+            and request.method in ('GET', 'HEAD')
+            and STICKY_COOKIE not in request.COOKIES
+        )
+
+    def finish(self, routing, response):
+        if routing.wrote and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                STICKY_COOKIE, '1',
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        return response
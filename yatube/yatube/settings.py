@@ -26,6 +26,7 @@ INSTALLED_APPS = [
     'about',
     'users',
     'posts',
+    'benchmarks',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -33,31 +34,40 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'sorl.thumbnail',
-    'debug_toolbar',
 ]
 
 MIDDLEWARE = [
+    'yatube.timing.ServerTimingMiddleware',
+    'yatube.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'yatube.staticfiles.StaticFilesMiddleware',
+    'yatube.routers.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
+# The toolbar middleware is sync only and would make an ASGI request hop
+# between the event loop and a thread at every middleware.
+if DEBUG:
+    INSTALLED_APPS.append('debug_toolbar')
+    MIDDLEWARE.append('debug_toolbar.middleware.DebugToolbarMiddleware')
+
 ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'yatube.timing.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'yatube.context_processors.year',
+                'yatube.context_processors.feed_cache',
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
@@ -69,17 +79,58 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
+ASGI_APPLICATION = 'yatube.asgi.application'
+
 
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 
+# Run on every new SQLite connection. WAL lets readers work alongside the
+# writer, and a writer waits for the lock instead of failing at once.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+}
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'yatube.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'PRAGMAS': SQLITE_PRAGMAS,
+        'CONN_MAX_AGE': 600,
     }
 }
 
+# Read-only copies of the database standing in for replicas locally, e.g.
+# SQLITE_REPLICAS=db-replica1.sqlite3,db-replica2.sqlite3; refresh them with
+# ``python manage.py copy_sqlite_replicas``.
+SQLITE_REPLICAS = [
+    os.path.join(BASE_DIR, name)
+    for name in os.environ.get('SQLITE_REPLICAS', '').split(',') if name
+]
+for number, path in enumerate(SQLITE_REPLICAS, start=1):
+    DATABASES[f'replica{number}'] = {
+        'ENGINE': 'yatube.backends.sqlite3',
+        'NAME': f'file:{path}?mode=ro',
+        'OPTIONS': {'uri': True},
+        'PRAGMAS': {
+            name: value for name, value in SQLITE_PRAGMAS.items()
+            if name != 'journal_mode'
+        },
+        'CONN_MAX_AGE': 600,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['yatube.routers.ReplicaRouter']
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+# Reads of a client stay on the primary this long after it wrote.
+REPLICA_STICKY_SECONDS = 5
+# A replica that refused a connection is skipped this long.
+REPLICA_RETRY_SECONDS = 30
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -119,9 +170,17 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
+STATICFILES_STORAGE = (
+    'yatube.staticfiles.CompressedManifestStaticFilesStorage'
+)
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# 'x-accel-redirect' (nginx) or 'x-sendfile' (Apache, lighttpd) hands media
+# bytes to the front server, None streams them from Django.
+MEDIA_SENDFILE = None
+# nginx location marked internal with an alias to MEDIA_ROOT.
+MEDIA_ACCEL_PREFIX = '/protected-media/'
 
 LOGIN_URL = "/auth/login/"
 LOGIN_REDIRECT_URL = "index"
@@ -131,13 +190,67 @@ EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
 
 PAGES_AMOUNT = 10
+COMMENTS_AMOUNT = 20
+
+FEED_CACHE_TIMEOUT = 60 * 60 * 6
 
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'yatube.metrics.MeteredCache',
+        'TIMED_BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
+# Feed generations must live in a cache shared by every process, in a local
+# memory cache they expire after GENERATION_LOCAL_TIMEOUT seconds instead and
+# pages are sent without conditional GET validators.
+GENERATIONS_CACHE = 'default'
+GENERATION_LOCAL_TIMEOUT = 20
+
 INTERNAL_IPS = [
     '127.0.0.1',
 ]
+
+# Authors with more followers than this are not fanned out into timelines,
+# their posts are merged into the follow feed at read time instead.
+TIMELINE_FANOUT_LIMIT = 5000
+TIMELINE_BACKFILL = 500
+TIMELINE_BATCH_SIZE = 1000
+
+POST_IMAGE_MAX_SIZE = 20 * 1024 * 1024
+POST_IMAGE_MAX_PIXELS = 40_000_000
+# Processes fully decoding uploaded images and how long a request waits.
+UPLOAD_CHECK_WORKERS = 2
+UPLOAD_CHECK_TIMEOUT = 10
+
+# Threads generating thumbnails after a post is saved, 0 runs them inline.
+THUMBNAIL_WORKERS = 2
+
+# Threads running ORM calls of async views under ASGI, each holding at most
+# one database connection.
+ASYNC_ORM_THREADS = 8
+
+# Shared directory where every worker process writes its metrics, so that
+# /metrics/ reports all workers of a prefork server.
+METRICS_DIR = os.environ.get('METRICS_DIR') or None
+METRICS_FLUSH_INTERVAL = 1
+# Scrapers send it as ``Authorization: Bearer <token>``; without a token
+# the endpoint is off.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN') or None
+
+# One JSON line per request with the Server-Timing figures; set
+# TIMING_LOG_LEVEL=INFO to write them to the console.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'yatube.timing': {
+            'handlers': ['console'],
+            'level': os.environ.get('TIMING_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
@@ -0,0 +1,155 @@
+"""Hashed, precompressed static files.
+
+``collectstatic`` writes every file under a content-hashed name together
+with ``.gz`` and ``.br`` siblings and a manifest. The middleware reads that
+manifest once at startup and serves the files with far-future immutable
+caching, picking a precompressed sibling the client accepts.
+"""
+import gzip
+import mimetypes
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import (
+    ManifestStaticFilesStorage, staticfiles_storage
+)
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse
+
+from .middleware import AsyncCapableMiddleware
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSED_EXTENSIONS = (
+    '.css', '.js', '.svg', '.json', '.map', '.txt', '.html', '.xml',
+)
+MIN_COMPRESSED_SIZE = 256
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'public, max-age=60'
+
+
+def compressors():
+    yield 'gzip', '.gz', lambda data: gzip.compress(data, 9, mtime=0)
+    if brotli is not None:
+        yield 'br', '.br', brotli.compress
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest storage that also writes ``.gz`` and ``.br`` siblings.
+
+    Until ``collectstatic`` has written a manifest the original names are
+    used, so development and tests run without collected files.
+    """
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in set(self.hashed_files.values()):
+            if not name.endswith(COMPRESSED_EXTENSIONS):
+                continue
+            with self.open(name) as original:
+                data = original.read()
+            if len(data) < MIN_COMPRESSED_SIZE:
+                continue
+            for _, suffix, compress in compressors():
+                compressed = compress(data)
+                if len(compressed) < len(data):
+                    with open(self.path(name + suffix), 'wb') as sibling:
+                        sibling.write(compressed)
+                    yield name + suffix, name + suffix, True
+
+
+def accepted_encodings(header):
+    accepted = set()
+    for coding in header.split(','):
+        name, _, params = coding.strip().partition(';')
+        if params.strip().replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00'):
+            continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+
+class StaticFilesMiddleware(AsyncCapableMiddleware):
+    """Serves collected static files from an index built at startup.
+
+    Hashed names are cached as immutable, original names briefly. Nothing is
+    looked up on disk per request beyond opening the chosen file.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.prefix = settings.STATIC_URL
+        hashed_files = getattr(staticfiles_storage, 'hashed_files', None)
+        if not hashed_files or not self.prefix.startswith('/'):
+            raise MiddlewareNotUsed
+        self.files = {}
+        for original, hashed in hashed_files.items():
+            self.add(original, hashed, REVALIDATE)
+            self.add(hashed, hashed, IMMUTABLE)
+
+    def add(self, name, stored, cache_control):
+        path = staticfiles_storage.path(stored)
+        if not os.path.isfile(path):
+            return
+        encodings = [
+            (coding, path + suffix)
+            for coding, suffix, _ in compressors()
+            if os.path.isfile(path + suffix)
+        ]
+        content_type = mimetypes.guess_type(stored)[0]
+        self.files[name] = (
+            path, encodings, content_type, cache_control,
+            os.path.basename(stored),
+        )
+
+    def handle(self, request):
+        entry = self.find(request)
+        if entry is not None:
+            return self.serve(request, *entry)
+        return self.get_response(request)
+
+    async def ahandle(self, request):
+        entry = self.find(request)
+        if entry is not None:
+            return self.serve(request, *entry)
+        return await self.get_response(request)
+
+    def find(self, request):
+        if (
+            request.method in ('GET', 'HEAD')
+            and request.path.startswith(self.prefix)
+        ):
+            return self.files.get(request.path[len(self.prefix):])
+        return None
+
+    def serve(
+        self, request, path, encodings, content_type, cache_control, filename
+    ):
+        accepted = accepted_encodings(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        encoding = None
+        for coding, compressed_path in reversed(encodings):
+            if coding in accepted:
+                encoding, path = coding, compressed_path
+                break
+        response = FileResponse(
+            open(path, 'rb'),
+            content_type=content_type or 'application/octet-stream',
+            filename=filename,
+        )
+        if encoding:
+            response['Content-Encoding'] = encoding
+        if encodings:
+            response['Vary'] = 'Accept-Encoding'
+        response['Cache-Control'] = cache_control
+        return response
@@ -0,0 +1,182 @@
+"""Per-request time spent on SQL, cache, thumbnails and templates.
+
+The figures go to a ``Server-Timing`` header and to one JSON log line per
+request on the ``yatube.timing`` logger. Recording is a clock read and a
+dict update per call, cheap enough to stay on in production. Categories
+overlap: template time includes the queries and cache calls made while
+rendering.
+"""
+import json
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.backends import django as django_backend
+from django.utils.module_loading import import_string
+
+from .middleware import AsyncCapableMiddleware
+
+CACHE_METHODS = frozenset((
+    'add', 'get', 'set', 'touch', 'delete', 'get_many', 'get_or_set',
+    'has_key', 'incr', 'decr', 'set_many', 'delete_many', 'clear',
+))
+
+logger = logging.getLogger(__name__)
+
+_timings = ContextVar('timings', default=None)
+_rendering = ContextVar('rendering', default=False)
+
+
+class Timings:
+    __slots__ = ('durations', 'counts')
+
+    def __init__(self):
+        self.durations = {}
+        self.counts = {}
+
+    def add(self, category, seconds):
+        self.durations[category] = self.durations.get(category, 0) + seconds
+        self.counts[category] = self.counts.get(category, 0) + 1
+
+
+def current():
+    """The timings of the request being handled, ``None`` outside one."""
+    return _timings.get()
+
+
+@contextmanager
+def measure(category):
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(category, perf_counter() - started)
+
+
+def record_query(execute, sql, params, many, context):
+    timings = _timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add('db', perf_counter() - started)
+
+
+def instrument(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+connection_created.connect(instrument, dispatch_uid='yatube.timing')
+
+
+class TimedCache:
+    """Cache backend timing the calls of the backend in ``TIMED_BACKEND``.
+
+    Configured like the wrapped backend, with its class moved to
+    ``TIMED_BACKEND``.
+    """
+
+    def __init__(self, location, params):
+        params = dict(params)
+        backend = import_string(params.pop('TIMED_BACKEND'))
+        self.backend = backend(location, params)
+
+    def __getattr__(self, name):
+        attribute = getattr(self.backend, name)
+        if name not in CACHE_METHODS:
+            return attribute
+
+        def timed(*args, **kwargs):
+            with measure('cache'):
+                return attribute(*args, **kwargs)
+
+        return timed
+
+    def __contains__(self, key):
+        with measure('cache'):
+            return key in self.backend
+
+
+class Template(django_backend.Template):
+    def render(self, context=None, request=None):
+        # Templates rendered from inside another one, like the post cards,
+        # are already part of the outer render.
+        if _rendering.get():
+            return super().render(context, request)
+        token = _rendering.set(True)
+        try:
+            with measure('template'):
+                return super().render(context, request)
+        finally:
+            _rendering.reset(token)
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    """Django templates with the rendering of each page timed."""
+
+    def get_template(self, template_name):
+        return Template(super().get_template(template_name).template, self)
+
+
+def server_timing(timings, total):
+    entries = [f'total;dur={total * 1000:.1f}']
+    for category, seconds in timings.durations.items():
+        entries.append(
+            f'{category};dur={seconds * 1000:.1f};'
+            f'desc="{timings.counts[category]}"'
+        )
+    return ', '.join(entries)
+
+
+class ServerTimingMiddleware(AsyncCapableMiddleware):
+    def handle(self, request):
+        for connection in connections.all():
+            instrument(connection)
+        timings = Timings()
+        token = _timings.set(timings)
+        started = perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _timings.reset(token)
+        return self.report(request, response, timings, started)
+
+    async def ahandle(self, request):
+        timings = Timings()
+        token = _timings.set(timings)
+        started = perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _timings.reset(token)
+        return self.report(request, response, timings, started)
+
+    def report(self, request, response, timings, started):
+        total = perf_counter() - started
+        response['Server-Timing'] = server_timing(timings, total)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'total_ms': round(total * 1000, 2),
+                **{
+                    f'{category}_ms': round(seconds * 1000, 2)
+                    for category, seconds in timings.durations.items()
+                },
+                **{
+                    f'{category}_count': count
+                    for category, count in timings.counts.items()
+                },
+            }))
+        return response